@@ -1,30 +1,25 @@
-import xarray as xr 
-import numpy as np
 import matplotlib.pyplot as plt
 from scipy.stats import pearsonr
+from pv_loader import open_cube
+from bbox import select_bbox
 
 # 读取 NetCDF 数据文件
 file_path = r'C:\Users\Chen Yong\Desktop\InnovationProgram\PV_2007_2016.nc'
-data = xr.open_dataset(file_path)
+data = open_cube(file_path)
 
 # 提取所需数据
 years = data['year'].values
 aod_data = data['AOD']  # 气溶胶光学厚度 (AOD)
 pv_data = data['PV']    # 光伏发电潜力 (PV)
 
-# 将填充值设置为NaN
-aod_data = xr.where(aod_data != -9999.0, aod_data, np.nan)
-pv_data = xr.where(pv_data != -9999.0, pv_data, np.nan)
-
 # 选择中国地区的经纬度范围
 lon_min, lon_max = 73.5, 135.0  # 中国的经度范围
 lat_min, lat_max = 18.0, 54.0   # 中国的纬度范围
 
-# 使用条件选择数据
-aod_data_china = aod_data.where((data['lon'] >= lon_min) & (data['lon'] <= lon_max) &
-                                  (data['lat'] >= lat_min) & (data['lat'] <= lat_max), drop=True)
-pv_data_china = pv_data.where((data['lon'] >= lon_min) & (data['lon'] <= lon_max) &
-                               (data['lat'] >= lat_min) & (data['lat'] <= lat_max), drop=True)
+# 按经纬度下标区间同时选取各变量（零拷贝视图，读取时已屏蔽填充值）
+data_china = select_bbox(data, lat_min, lat_max, lon_min, lon_max, variables=['AOD', 'PV'])
+aod_data_china = data_china['AOD']
+pv_data_china = data_china['PV']
 
 # 过滤时间范围为 2007 到 2022 年
 aod_data_china = aod_data_china.sel(year=slice(2007, 2022))
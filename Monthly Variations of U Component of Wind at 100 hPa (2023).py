@@ -1,7 +1,7 @@
 import xarray as xr
 import matplotlib.pyplot as plt
-import cartopy.crs as ccrs
 import numpy as np
+from panel_grid import PanelGrid
 
 # 文件路径
 file_path = r'C:\Users\Chen Yong\Desktop\InnovationProgram\ERA5 monthly averaged data on pressure levels of 2023.nc'
@@ -16,32 +16,17 @@ data = xr.open_dataset(file_path)
 u_wind = data['u'].isel(pressure_level=0)  # 选择100 hPa层
 v_wind = data['v'].isel(pressure_level=0)  # 选择100 hPa层
 
-# 创建地图投影
-proj = ccrs.PlateCarree()
+# 建立 3×4 子图模板：坐标轴、海岸线和色标只创建一次，逐月只替换数据
+grid = PanelGrid(u_wind.longitude, u_wind.latitude, 3, 4, levels=np.linspace(-20, 20, 21),
+                 cmap='coolwarm', figsize=(20, 15))
+grid.colorbar.set_label('U Component of Wind at 100 hPa (m/s)', fontsize=16)
+grid.colorbar.ax.tick_params(labelsize=13)  # 调整颜色条的刻度标签大小
 
-# 设置图形和子图
-fig, axes = plt.subplots(3, 4, figsize=(20, 15), subplot_kw={'projection': proj})
-
-# 设置颜色映射
-cmap = plt.get_cmap('coolwarm')
-
-# 逐月绘制数据
-for i, ax in enumerate(axes.flat):
-    # 提取每个月的数据（2D数据）
+# 逐月填入数据，西风（正值）为暖色，东风（负值）为冷色
+for i in range(len(grid.axes)):
     u_month = u_wind.isel(date=i)  # 选择第i个月的U风分量
-
-    # 绘制风速的颜色映射，西风（正值）为暖色，东风（负值）为冷色
-    contour = ax.contourf(u_month.longitude, u_month.latitude, u_month, 
-                          cmap=cmap, levels=np.linspace(-20, 20, 21), extend='both')
-    
-    # 设置地图特征
-    ax.coastlines()
-    ax.set_title(f'Month {i + 1}', fontsize=16, loc='center', pad=10)  # 减小标题的上边距
-
-# 添加颜色条，放置在图的最下方
-cbar = fig.colorbar(contour, ax=axes.ravel().tolist(), orientation='horizontal', pad=0.02, aspect=50)
-cbar.set_label('U Component of Wind at 100 hPa (m/s)', fontsize=16)
-cbar.ax.tick_params(labelsize=13)  # 调整颜色条的刻度标签大小
+    grid.set_panel(i, u_month.values, f'Month {i + 1}', fontsize=16, loc='center', pad=10)  # 减小标题的上边距
+fig = grid.fig
 
 # 添加总标题
 plt.suptitle('Monthly Variations of U Component of Wind at 100 hPa (2023)', fontsize=22, y=0.88)  # 调整y值以放低标题
@@ -1,10 +1,12 @@
 import numpy as np 
-import xarray as xr
 import matplotlib.pyplot as plt
+from pvpot import compute_pvpot
+from pv_loader import open_cube
+from region_weights import CHINA_REGIONS, region_weight_matrix, regional_mean
 
-# 读取netCDF文件
+# 读取netCDF文件（已将填充值设置为NaN）
 file_path = r'C:\Users\Chen Yong\Desktop\InnovationProgram\PV_2007_2016.nc'
-data = xr.open_dataset(file_path)
+data = open_cube(file_path, variables=('DSW', 'Tas', 'Wind', 'PV'))
 
 # 提取需要的变量
 I = data['DSW']  # 短波辐射
@@ -13,37 +15,15 @@ W = data['Wind']  # 风速
 PV = data['PV']   # 光伏发电量
 years = data['year'].values
 
-# 定义性能比参数
-Istc = 1000  # 标准测试条件下的短波辐射 W/m^2
-Tstc = 25    # 标准测试条件下的温度，单位：℃ 
-Y = 0.005    # 性能比温度系数，单晶硅太阳能电池
-
-# 计算电池温度 Tcell
+# 计算PVpot（逐年分块融合计算，不生成 Tcell、PR 中间数据块）
 c1, c2, c3, c4 = 2, 0.95, 0.05, 1.5  # 假设系数
-Tcell = c1 + c2 * T + c3 * I - c4 * W
-
-# 计算性能比 PR
-PR = 1 - Y * (Tcell - Tstc)
-
-# 计算PVpot
-PVpot = PR * I / Istc
-
-# 定义不同地区的经纬度范围
-regions = {
-    "North China": [(34, 42), (114, 120)],
-    "Northeast China": [(42, 54), (122, 135)],
-    "East China": [(25, 34), (118, 123)],
-    "Central China": [(28, 34), (108, 118)],
-    "South China": [(20, 28), (110, 117)],
-    "Southwest China": [(22, 34), (98, 108)],
-    "Northwest China": [(34, 42), (85, 110)],
-}
+PVpot = compute_pvpot(I, T, W, coeffs=(c1, c2, c3, c4))
 
-# 计算每个地区的平均PVpot值
-region_avg_pvpot = {}
-for region, ((lat_min, lat_max), (lon_min, lon_max)) in regions.items():
-    region_data = PVpot.sel(lat=slice(lat_min, lat_max), lon=slice(lon_min, lon_max))
-    region_avg_pvpot[region] = region_data.mean(dim=('lat', 'lon'))
+# 计算每个地区的面积加权平均PVpot值（区域 × 格点权重矩阵，一次矩阵乘法得到所有地区）
+regions = CHINA_REGIONS
+weights, region_names = region_weight_matrix(data['lat'].values, data['lon'].values, regions)
+region_series = regional_mean(PVpot, weights, region_names)
+region_avg_pvpot = {region: region_series.sel(region=region) for region in region_names}
 
 # 定义不同地区的折线符号和颜色
 markers = ['o', 's', 'D', '^', 'v', 'P', '*']
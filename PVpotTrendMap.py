@@ -11,6 +11,7 @@ import matplotlib.pyplot as plt
 import cartopy.crs as ccrs
 import cartopy.feature as cfeature
 from matplotlib.colors import BoundaryNorm
+from pixel_trend import trend_map
 
 # 读取 NetCDF 数据文件
 file_path = r'C:\Users\Chen Yong\Desktop\InnovationProgram\PV_2007_2016.nc'
@@ -24,20 +25,8 @@ lon = data['lon'].values
 lat = data['lat'].values
 years = data['year'].values
 
-# 创建空数组来存储每个经纬度格点的趋势
-trend = np.zeros((len(lat), len(lon)))
-
-# 逐个经纬度格点计算线性趋势
-for i in range(len(lat)):
-    for j in range(len(lon)):
-        # 提取每个经纬度格点在各年的 PV 数据
-        pv_series = pv_data[:, :, i, j].mean(dim='month')  # 对月份求平均值，得到逐年变化的 PV 值
-        # 如果 PV 数据中存在 NaN，跳过该点的趋势计算
-        if np.all(np.isnan(pv_series)):
-            trend[i, j] = np.nan
-        else:
-            # 使用 np.polyfit 计算线性趋势，度数为1
-            trend[i, j] = np.polyfit(years - years[0], pv_series, 1)[0]  # 返回斜率（趋势）
+# 对所有经纬度格点一次性计算线性趋势（先对月份求平均，全为 NaN 的格点结果为 NaN）
+trend = trend_map(pv_data, method='ols')['slope'].values
 
 # 设置颜色映射范围（更密集的级别）
 levels = np.linspace(-0.005, 0.005, 51)  # 增加颜色变化的分级密度
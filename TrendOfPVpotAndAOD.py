@@ -1,11 +1,12 @@
-import xarray as xr
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy.stats import pearsonr
+from pvpot import compute_pvpot
+from pv_loader import open_cube
 
-# 读取 NetCDF 数据文件
+# 读取 NetCDF 数据文件（已将填充值设置为NaN）
 file_path = r'C:\Users\Chen Yong\Desktop\InnovationProgram\PV_2007_2016.nc'
-data = xr.open_dataset(file_path)
+data = open_cube(file_path, variables=('AOD', 'DSW', 'Tas', 'Wind'))
 
 # 查看数据集中的变量及其维度
 #print(data)
@@ -17,20 +18,9 @@ I = data['DSW']  # 短波辐射 (DSW)
 T = data['Tas']  # 气温 (Tas)
 WS = data['Wind']  # 风速 (Wind)
 
-# 计算 Tcell 和 PVpot 的步骤
+# 计算光伏潜力 PVpot（逐年分块融合计算，不生成 Tcell、PR 中间数据块）
 c1, c2, c3, c4 = 2.56, 0.47, 0.065, 1.02  # 假设的常数值
-Tstc = 25  # 标准测试条件下温度 (25°C)
-Y = 0.005  # 单晶硅太阳能电池的Y系数
-Istc = 1000  # 标准短波辐射 (1000 W/m²)
-
-# 计算 Tcell
-Tcell = c1 + c2 * T + c3 * I - c4 * WS
-
-# 计算性能比 PR
-PR = 1 - Y * (Tcell - Tstc)
-
-# 计算光伏潜力 PVpot
-PVpot = PR * I / Istc
+PVpot = compute_pvpot(I, T, WS, coeffs=(c1, c2, c3, c4))
 
 # 对纬度、经度和月份维度进行平均，获得每年的 AOD 和 PVpot 数据
 aod_annual = aod_data.mean(dim=['lat', 'lon', 'month'])
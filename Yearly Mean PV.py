@@ -1,54 +1,35 @@
-import xarray as xr
-import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.colors import LinearSegmentedColormap
 import cartopy.crs as ccrs
-import cartopy.feature as cfeature
 from cartopy.mpl.gridliner import LONGITUDE_FORMATTER, LATITUDE_FORMATTER
 from cartopy.io.shapereader import Reader
 from cartopy.feature import ShapelyFeature
 from shapely.geometry import box
+from pv_loader import open_cube
+from climatology import load_climatology
+from base_map import add_layers
 
 # 设置字体大小
 plt.rcParams["font.size"] = 13
 
 # 读取数据
-data = xr.open_dataset(r"C:\Users\Chen Yong\Desktop\InnovationProgram\PV_2007_2016.nc")
+file_path = r"C:\Users\Chen Yong\Desktop\InnovationProgram\PV_2007_2016.nc"
+data = open_cube(file_path)
 
 # 提取PV数据
 pv = data['PV']
 
-# 选择特定月份的数据
-spring = [3, 4, 5]
-summer = [6, 7, 8]
-fall = [9, 10, 11]
-winter = [12, 1, 2]
-year = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12]
-
 # 获取实际的经度和纬度数组
 lon = data['lon'].values
 lat = data['lat'].values
 
-# 选择指定年份、月份和地区的PV数据
-spring_pv = pv.sel(year=slice(2007, 2022), month=spring)
-summer_pv = pv.sel(year=slice(2007, 2022), month=summer)
-fall_pv = pv.sel(year=slice(2007, 2022), month=fall)
-winter_pv = pv.sel(year=slice(2007, 2022), month=winter)
-year_pv = pv.sel(year=slice(2007, 2022), month=year)
-
-# 将填充值设置为NaN
-spring_pv = xr.where(spring_pv != -9999.0, spring_pv, np.nan)
-summer_pv = xr.where(summer_pv != -9999.0, summer_pv, np.nan)
-fall_pv = xr.where(fall_pv != -9999.0, fall_pv, np.nan)
-winter_pv = xr.where(winter_pv != -9999.0, winter_pv, np.nan)
-year_pv = xr.where(year_pv != -9999.0, year_pv, np.nan)
-
-# 计算各季节和年平均的PV值
-spring_mean = spring_pv.mean(dim=('year', 'month'))
-summer_mean = summer_pv.mean(dim=('year', 'month'))
-fall_mean = fall_pv.mean(dim=('year', 'month'))
-winter_mean = winter_pv.mean(dim=('year', 'month'))
-year_mean = year_pv.mean(dim=('year', 'month'))
+# 读取各季节和年平均的PV值（一次扫描得到并缓存，已屏蔽填充值）
+clim = load_climatology('PV', years=(2007, 2022), data=data, path=file_path)
+spring_mean = clim['spring']
+summer_mean = clim['summer']
+fall_mean = clim['fall']
+winter_mean = clim['winter']
+year_mean = clim['year']
 # 创建自定义colormap
 colors = ["blue", "cyan",  "yellow", "red"]  # 蓝色过渡到青色过渡到绿色过渡到黄色过渡到红色
 cmap = LinearSegmentedColormap.from_list("custom_cmap", colors, N=256)
@@ -57,18 +38,14 @@ cmap = LinearSegmentedColormap.from_list("custom_cmap", colors, N=256)
 def plot_seasonal_mean(mean_data, title, ax, vmin, vmax):
     mean_data.plot(ax=ax, transform=ccrs.PlateCarree(), cmap=cmap, add_colorbar=True, cbar_kwargs={'ticks': [0, 0.1, 0.2, 0.3, 0.4]}, vmin=vmin, vmax=vmax)
     ax.set_title(title)
-    ax.add_feature(cfeature.COASTLINE)
-    ax.add_feature(cfeature.BORDERS, linestyle='-', alpha=.5)
-    ax.add_feature(cfeature.NaturalEarthFeature('cultural', 'admin_1_states_provinces_lines', '50m', edgecolor='black', facecolor='none'))
+    add_layers(ax, ('coastline', 'borders', 'provinces'))  # 缓存的底图图层
     ax.set_extent([70, 140, 15, 55], crs=ccrs.PlateCarree())  # 设置中国区域范围
 
     # 添加南海小图
     ax_inset = ax.inset_axes([0.7, 0.1, 0.3, 0.3], projection=ccrs.PlateCarree())
     mean_data.plot(ax=ax_inset, transform=ccrs.PlateCarree(), cmap=cmap, add_colorbar=False, vmin=vmin, vmax=vmax)
     ax_inset.set_extent([105, 125, 0, 25], crs=ccrs.PlateCarree())
-    ax_inset.add_feature(cfeature.COASTLINE)
-    ax_inset.add_feature(cfeature.BORDERS, linestyle='-', alpha=.5)
-    ax_inset.add_feature(cfeature.NaturalEarthFeature('cultural', 'admin_1_states_provinces_lines', '50m', edgecolor='black', facecolor='none'))
+    add_layers(ax_inset, ('coastline', 'borders', 'provinces'))
 
     # 设置南海小图的经纬度刻度
     ax_inset.set_xticks([106, 125], crs=ccrs.PlateCarree())
@@ -5,14 +5,13 @@ Created on Wed Apr 24 15:48:14 2024
 @author: Chen Yong
 """
 
-import xarray as xr
-import numpy as np
 import matplotlib.pyplot as plt
 import cartopy.crs as ccrs
 import cartopy.feature as cfeature
+from pv_loader import open_cube
 
 # 加载ERA5数据
-data = xr.open_dataset(r'C:\Users\Chen Yong\Downloads\PV_2007_2016.nc')
+data = open_cube(r'C:\Users\Chen Yong\Downloads\PV_2007_2016.nc')
 
 
 
@@ -38,9 +37,6 @@ lon = average_aod['lon'].values
 lat = average_aod['lat'].values
 a = average_aod.values
 
-# 将风速数据中的填充值设置为NaN
-a = np.where(a == -9999.0, np.nan, a)
-
 # 创建地图
 fig = plt.figure(figsize=(10, 8), dpi=1000)
 
@@ -85,7 +81,6 @@ ax_inset.set_extent(south_china_sea_extent)
 selected_data_land = aod.sel(year=years[(years >= 2007) & (years <= 2022)], month=12, lon=lon_range, lat=lat_range)
 average_aod_land = selected_data_land.mean(dim='year')
 a_land = average_aod_land.values
-a_land = np.where(a_land == -9999.0, np.nan, a_land)
 
 # 绘制中国陆地的风速空间分布
 ax_inset.pcolormesh(lon, lat, a_land, cmap='jet', transform=ccrs.PlateCarree(), antialiased=True)
@@ -5,14 +5,14 @@ Created on Wed Apr 24 14:39:27 2024
 @author: Chen Yong
 """
 
-import xarray as xr
 import numpy as np
 import matplotlib.pyplot as plt
 import cartopy.crs as ccrs
 import cartopy.feature as cfeature
+from pv_loader import open_cube
 
 # 加载ERA5数据
-data = xr.open_dataset(r'C:\Users\Chen Yong\Downloads\PV_2007_2016.nc')
+data = open_cube(r'C:\Users\Chen Yong\Downloads\PV_2007_2016.nc')
 
 # 提取AOD数据
 aod = data["AOD"]
@@ -35,8 +35,6 @@ mean_aod = selected_data.mean(dim=["year", "month"])
 lon = data["lon"].values
 lat = data["lat"].values
 aod_values = mean_aod.values
-# 将AOD数据中的填充值设置为NaN
-aod_values = np.where(aod_values == -9999.0, np.nan, aod_values)
 
 # 创建地图
 fig = plt.figure(figsize=(10, 8), dpi=1000, facecolor="white")  # 设置背景为白色
@@ -60,7 +58,6 @@ ax.gridlines(draw_labels=True, linestyle="--", alpha=0.5)
 # 将超出中国边境范围的AOD值设置为NaN
 china_land_aod = mean_aod.sel(lat=lat_range, lon=lon_range)
 china_land_aod_values = china_land_aod.values
-china_land_aod_values = np.where(china_land_aod_values == -9999.0, np.nan, china_land_aod_values)
 
 # 绘制空间分布图（使用掩码处理）
 masked_aod_values = np.ma.masked_invalid(aod_values)
@@ -89,7 +86,6 @@ ax_inset.set_extent(south_china_sea_extent)
 # 计算中国陆地部分的AOD多年平均分布
 china_land_aod = mean_aod.sel(lat=lat_range, lon=lon_range)
 china_land_aod_values = china_land_aod.values
-china_land_aod_values = np.where(china_land_aod_values == -9999.0, np.nan, china_land_aod_values)# 将超出中国边境范围的AOD值设置为NaN
 
 
 # 绘制中国陆地的AOD多年平均分布（使用掩码处理）
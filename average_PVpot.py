@@ -12,14 +12,13 @@ Created on Tue Apr 23 15:43:49 2024
 @author: Chen Yong
 """
 
-import xarray as xr
-import numpy as np
 import matplotlib.pyplot as plt
 import cartopy.crs as ccrs
 import cartopy.feature as cfeature
+from pv_loader import open_cube
 
 # 加载ERA5数据
-data = xr.open_dataset(r'C:\Users\Chen Yong\Downloads\PV_2007_2016.nc')
+data = open_cube(r'C:\Users\Chen Yong\Downloads\PV_2007_2016.nc')
 
 
 
@@ -45,9 +44,6 @@ lon = average_pv['lon'].values
 lat = average_pv['lat'].values
 p = average_pv.values
 
-# 将风速数据中的填充值设置为NaN
-p = np.where(p == -9999.0, np.nan, p)
-
 # 创建地图
 fig = plt.figure(figsize=(10, 8), dpi=1000)
 
@@ -92,7 +88,6 @@ ax_inset.set_extent(south_china_sea_extent)
 selected_data_land = pv.sel(year=years[(years >= 2007) & (years <= 2022)], month=12, lon=lon_range, lat=lat_range)
 average_pv_land = selected_data_land.mean(dim='year')
 p_land = average_pv_land.values
-p_land = np.where(p_land == -9999.0, np.nan, p_land)
 
 # 绘制中国陆地的风速空间分布
 ax_inset.pcolormesh(lon, lat, p_land, cmap='jet', transform=ccrs.PlateCarree(), antialiased=True)
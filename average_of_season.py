@@ -5,14 +5,15 @@ Created on Tue Apr 23 20:48:37 2024
 @author: Chen Yong
 """
 
-import xarray as xr
-import numpy as np
 import matplotlib.pyplot as plt
 import cartopy.crs as ccrs
 import cartopy.feature as cfeature
+from pv_loader import open_cube
+from climatology import load_climatology, months_mean
 
 # 加载ERA5数据
-data = xr.open_dataset(r'C:\Users\Chen Yong\Downloads\PV_2007_2016.nc')
+file_path = r'C:\Users\Chen Yong\Downloads\PV_2007_2016.nc'
+data = open_cube(file_path)
 
 # 提取风速数据
 wind_speed = data['Wind']
@@ -38,23 +39,19 @@ seasons = {
 # 创建colorbar
 cax = fig.add_axes([0.94, 0.15, 0.02, 0.7])
 
+# 读取缓存的逐月累加量（一次扫描得到，已屏蔽填充值）
+clim = load_climatology('Wind', years=(2007, 2022), region=(-10, 60, 70, 140), data=data, path=file_path)
+
 # 绘制四季风速平均空间分布图
 for i, (season, months) in enumerate(seasons.items()):
-    # 提取指定季节的风速数据
-    selected_data = wind_speed.sel(year=years[(years >= 2007) & (years <= 2022)],
-                                   month=np.isin(data['month'].values, months),
-                                   lon=lon_range, lat=lat_range)
-    # 计算季节平均风速
-    average_wind_speed = selected_data.mean(dim=['year', 'month'])
+    # 计算季节平均（由逐月累加量直接得到）
+    average_wind_speed = months_mean(clim, months)
     
     # 提取经度、纬度和风速数据
     lon = average_wind_speed['lon'].values
     lat = average_wind_speed['lat'].values
     wind = average_wind_speed.values
     
-    # 将风速数据中的填充值设置为NaN
-    wind = np.where(wind == -9999.0, np.nan, wind)
-    
     # 绘制子图
     ax = fig.add_subplot(2, 2, i+1, projection=ccrs.PlateCarree())
     
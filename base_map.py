@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+
+import os
+import hashlib
+import pickle
+import shapely
+import cartopy.crs as ccrs
+import cartopy.feature as cfeature
+from cartopy.mpl.gridliner import LONGITUDE_FORMATTER, LATITUDE_FORMATTER
+from china_mask import load_boundaries
+from pv_loader import write_atomic
+
+# 底图图层缓存：海岸线、国界、省界（Natural Earth）和 cnmaps 的中国国界 / 省界
+# 每个进程只读取、简化一次，简化后的几何以 WKB 形式保存到磁盘，
+# 之后任何图、任何子图和南海小图直接 add_geometries，不再重复读取 shapefile
+
+BASEMAP_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'basemap_cache')
+
+CHINA_EXTENT = [70, 140, 15, 55]
+NANHAI_EXTENT = [105, 125, 0, 25]
+
+# 名称: (来源, 参数)
+LAYERS = {
+    'coastline': ('natural_earth', ('physical', 'coastline', '50m')),
+    'borders': ('natural_earth', ('cultural', 'admin_0_boundary_lines_land', '50m')),
+    'provinces': ('natural_earth', ('cultural', 'admin_1_states_provinces_lines', '50m')),
+    'land': ('natural_earth', ('physical', 'land', '50m')),
+    'china': ('cnmaps', '国'),
+    'china_provinces': ('cnmaps', '省'),
+}
+
+LAYER_STYLES = {
+    'coastline': dict(edgecolor='black', facecolor='none', linewidth=0.8),
+    'borders': dict(edgecolor='black', facecolor='none', linewidth=0.8, alpha=0.5),
+    'provinces': dict(edgecolor='black', facecolor='none', linewidth=0.5),
+    'land': dict(edgecolor='none', facecolor='lightgray'),
+    'china': dict(edgecolor='black', facecolor='none', linewidth=1.2),
+    'china_provinces': dict(edgecolor='black', facecolor='none', linewidth=0.5),
+}
+
+# 给定 shapefile 时改用该文件作为来源的图层: load_boundaries 的 level
+SHAPEFILE_LAYERS = {'china': 'country', 'china_provinces': 'province'}
+
+_memory = {}
+
+
+def _cache_file(name, tolerance, shapefile, cache_dir):
+    # 只有 SHAPEFILE_LAYERS 中的图层受 shapefile 影响，其余图层共用同一缓存
+    if shapefile is None or name not in SHAPEFILE_LAYERS:
+        source = 'builtin'
+    else:
+        source = hashlib.sha1(os.path.abspath(shapefile).encode()).hexdigest()[:8]
+    return os.path.join(cache_dir, f'{name}_{source}_{tolerance:g}.pkl')
+
+
+def _read_source(name, shapefile=None):
+    if shapefile is not None and name in SHAPEFILE_LAYERS:
+        return load_boundaries(SHAPEFILE_LAYERS[name], shapefile)[1]
+    kind, args = LAYERS[name]
+    if kind == 'natural_earth':
+        return list(cfeature.NaturalEarthFeature(*args).geometries())
+    from cnmaps import get_adm_maps
+    # 国界取全部记录（含南海诸岛和九段线），与 draw_maps(get_adm_maps(level='国')) 一致
+    return list(get_adm_maps(country='中华人民共和国', level=args)['geometry'])
+
+
+def load_layer(name, tolerance=0.01, shapefile=None, cache_dir=BASEMAP_CACHE_DIR):
+    """读取图层几何列表：先查内存，再查磁盘（WKB），都没有才读取原始数据并简化
+
+    shapefile 给定时以该文件代替 cnmaps 作为 'china' / 'china_provinces' 的来源，
+    其他图层不受影响。
+    """
+    path = _cache_file(name, tolerance, shapefile, cache_dir)
+    if path in _memory:
+        return _memory[path]
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            geoms = list(shapely.from_wkb(pickle.load(f)))
+    else:
+        geoms = shapely.simplify(_read_source(name, shapefile), tolerance, preserve_topology=True)
+        geoms = [g for g in geoms if g is not None and not g.is_empty]
+        os.makedirs(cache_dir, exist_ok=True)
+        write_atomic(path, lambda f: pickle.dump(list(shapely.to_wkb(geoms)), f))
+    _memory[path] = geoms
+    return geoms
+
+
+def add_layers(ax, layers=('coastline', 'borders'), shapefile=None, **style):
+    """把缓存的图层画到 ax 上；style 覆盖默认的线宽、颜色等"""
+    artists = []
+    for name in layers:
+        kwargs = dict(LAYER_STYLES.get(name, {}), **style)
+        artists.append(ax.add_geometries(load_layer(name, shapefile=shapefile),
+                                         crs=ccrs.PlateCarree(), **kwargs))
+    return artists
+
+
+def add_gridlines(ax, **kwargs):
+    """只在左侧、底部标注经纬度的网格线"""
+    style = dict(draw_labels=True, linestyle=':', linewidth=0.1, x_inline=False, y_inline=False, color='k')
+    style.update(kwargs)
+    gl = ax.gridlines(**style)
+    gl.top_labels = False
+    gl.right_labels = False
+    gl.rotate_labels = None
+    gl.xformatter = LONGITUDE_FORMATTER
+    gl.yformatter = LATITUDE_FORMATTER
+    return gl
+
+
+def add_nanhai(ax, bounds=(0.7, 0.1, 0.3, 0.3), layers=('china',), extent=NANHAI_EXTENT, **style):
+    """在 ax 右下角添加南海小图并画好缓存的边界，返回小图的 axes，供调用方画数据"""
+    ax_inset = ax.inset_axes(list(bounds), projection=ccrs.PlateCarree())
+    ax_inset.set_extent(extent, crs=ccrs.PlateCarree())
+    add_layers(ax_inset, layers, **style)
+    return ax_inset
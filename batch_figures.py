@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+
+import os
+import numpy as np
+from pv_loader import FILE_PATH, open_cube
+from climatology import SEASONS
+from bbox import select_bbox
+from pixel_trend import linear_trend
+from parallel import run_parallel
+
+# 批量出图：一次把数据块读入内存，按产品列表 (变量, 季节/月份, 区域, 统计量)
+# 在主进程里算好所有二维场，再把绘图任务分给多个进程（Agg 后端）并行渲染保存。
+# 数据更新后运行一次 render_all 即可重新生成 wind_speed_*、average_*、四季平均等整套图。
+# 注意：Windows 下调用需放在 if __name__ == '__main__': 之下
+
+CHINA_REGION = (10, 60, 70, 140)  # (lat_min, lat_max, lon_min, lon_max)
+STATISTICS = ('mean', 'std', 'trend')
+
+LABELS = {'AOD': 'AOD', 'PV': 'PVpot', 'Wind': 'Wind Speed (m/s)', 'DSW': 'DSW (W/m$^2$)', 'Tas': 'Tas (℃)'}
+
+DEFAULT_PRODUCTS = [(v, s, CHINA_REGION, 'mean') for v in ('AOD', 'PV', 'Wind') for s in SEASONS] + \
+                   [(v, 12, CHINA_REGION, 'mean') for v in ('AOD', 'PV', 'Wind')]
+
+
+def _months(months):
+    # 季节名、单个月份或月份列表 → (月份列表, 文件名中的标签)
+    if isinstance(months, str):
+        return SEASONS[months], months
+    months = list(np.atleast_1d(months))
+    return months, 'm' + '-'.join(str(m) for m in months)
+
+
+def reduce_product(data, product, years=(2007, 2022)):
+    """由内存中的数据块计算一个产品的 (lat, lon) 场
+
+    statistic 为 mean（多年平均）、std（所选月份平均值的年际标准差）
+    或 trend（所选月份平均值的线性趋势，每十年）。
+    """
+    variable, months, region, statistic = product
+    months, _ = _months(months)
+    da = data[variable]
+    if region is not None:
+        da = select_bbox(da, *region)
+    da = da.sel(year=slice(*years), month=months)
+    annual = da.mean(dim='month')
+    if statistic == 'mean':
+        return da.mean(dim=('year', 'month'))
+    if statistic == 'std':
+        return annual.std(dim='year', ddof=1)
+    if statistic == 'trend':
+        annual = annual.transpose('year', 'lat', 'lon')
+        slope = linear_trend(annual.values, annual['year'].values)['slope'] * 10
+        return annual.isel(year=0, drop=True).copy(data=slope)
+    raise ValueError(f'未知的统计量: {statistic}')
+
+
+def render_figure(job):
+    """子进程的工作函数：用 Agg 后端画一张图并保存，返回文件名"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import cartopy.crs as ccrs
+    from map_render import draw_raster
+    from base_map import add_layers, add_gridlines, add_nanhai, CHINA_EXTENT
+
+    lon, lat, field = job['lon'], job['lat'], job['field']
+    levels = np.linspace(job['vmin'], job['vmax'], 21)
+    fig = plt.figure(figsize=(10, 8), dpi=job.get('dpi', 300))
+    ax = fig.add_subplot(1, 1, 1, projection=ccrs.PlateCarree())
+    im = draw_raster(ax, lon, lat, field, job.get('cmap', 'jet'), levels)
+    add_layers(ax, ('coastline', 'borders', 'china'))
+    ax.set_extent(CHINA_EXTENT, crs=ccrs.PlateCarree())
+    add_gridlines(ax)
+    ax.set_title(job['title'])
+    fig.colorbar(im, ax=ax, shrink=0.8, pad=0.03, label=job['label'])
+
+    ax_inset = add_nanhai(ax, layers=('coastline', 'china'))
+    draw_raster(ax_inset, lon, lat, field, job.get('cmap', 'jet'), levels)
+
+    fig.savefig(job['filename'], bbox_inches='tight')
+    plt.close(fig)
+    return job['filename']
+
+
+def _job(field, product, years, out_dir, dpi):
+    variable, months, _, statistic = product
+    _, tag = _months(months)
+    values = np.ma.masked_invalid(field.values)
+    finite = values.compressed()
+    if statistic == 'trend':
+        bound = float(np.abs(finite).max()) if finite.size else 1.0
+        vmin, vmax = -bound, bound
+    else:
+        vmin, vmax = (float(finite.min()), float(finite.max())) if finite.size else (0.0, 1.0)
+    if vmax <= vmin:
+        vmax = vmin + 1.0
+    title = f'{LABELS.get(variable, variable)} {statistic} ({tag} {years[0]}-{years[1]})'
+    return {'field': values, 'lon': field['lon'].values, 'lat': field['lat'].values,
+            'vmin': vmin, 'vmax': vmax, 'title': title, 'label': LABELS.get(variable, variable),
+            'cmap': 'RdBu_r' if statistic == 'trend' else 'jet', 'dpi': dpi,
+            'filename': os.path.join(out_dir, f'{variable}_{tag}_{statistic}_{years[0]}-{years[1]}.png')}
+
+
+def render_all(products=DEFAULT_PRODUCTS, path=FILE_PATH, out_dir='figures', years=(2007, 2022),
+               processes=None, dpi=300):
+    """一次读入数据、算好所有产品并并行出图，返回保存的文件列表"""
+    os.makedirs(out_dir, exist_ok=True)
+    variables = sorted({p[0] for p in products})
+    data = open_cube(path, variables=variables).load()
+    jobs = [_job(reduce_product(data, p, years), p, years, out_dir, dpi) for p in products]
+
+    return run_parallel(render_figure, [(job,) for job in jobs], processes)
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import xarray as xr
+
+# 经纬度框选区：在有序坐标上用 searchsorted 把经纬度范围一次换算成整数下标区间，
+# 对所有变量用同一组切片 isel，得到零拷贝视图，不再对整个数据块广播布尔条件
+
+
+def index_range(coord, vmin, vmax):
+    """返回闭区间 [vmin, vmax] 在有序坐标上对应的 slice，支持升序和降序"""
+    coord = np.asarray(coord)
+    if coord.size > 1 and coord[0] > coord[-1]:
+        # 降序坐标：在反转后的数组上查找再换算回原下标
+        rev = coord[::-1]
+        lo = np.searchsorted(rev, vmin, side='left')
+        hi = np.searchsorted(rev, vmax, side='right')
+        return slice(coord.size - hi, coord.size - lo)
+    lo = np.searchsorted(coord, vmin, side='left')
+    hi = np.searchsorted(coord, vmax, side='right')
+    return slice(lo, hi)
+
+
+def bbox_index(lat, lon, lat_min, lat_max, lon_min, lon_max):
+    """经纬度框对应的 (lat 切片, lon 切片)"""
+    return index_range(lat, lat_min, lat_max), index_range(lon, lon_min, lon_max)
+
+
+def select_bbox(data, lat_min, lat_max, lon_min, lon_max, variables=None):
+    """对 Dataset 中的多个变量同时取经纬度框，返回共享同一组切片的视图
+
+    variables 为 None 时取全部数据变量；data 也可以是单个 DataArray。
+    """
+    lat_slice, lon_slice = bbox_index(data['lat'].values, data['lon'].values,
+                                      lat_min, lat_max, lon_min, lon_max)
+    if isinstance(data, xr.DataArray):
+        return data.isel(lat=lat_slice, lon=lon_slice)
+    if variables is not None:
+        data = data[list(variables)]
+    return data.isel(lat=lat_slice, lon=lon_slice)
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import xarray as xr
+from pixel_trend import linear_trend
+
+# 变化图：先把 (year, month, lat, lon) 沿月份归并成逐年数组（只做一次），
+# 再同时得到首末年差值、回归得到的每十年变化和百分比变化。
+# 主图和南海小图使用同一个结果数组
+
+
+def annual_values(data, reduce='mean'):
+    # reduce='sum' 时任一月份缺测则该年为 NaN，避免缺测月份被当作 0 累加
+    if 'month' not in data.dims:
+        return data.transpose('year', ...)
+    if reduce == 'sum':
+        annual = data.sum(dim='month', skipna=False)
+    elif reduce == 'mean':
+        annual = data.mean(dim='month')
+    else:
+        raise ValueError(f'未知的归并方式: {reduce}')
+    return annual.transpose('year', ...)
+
+
+def change_maps(data, start=None, end=None, reduce='mean'):
+    """计算 start 到 end 年的变化图，返回 Dataset：
+
+    endpoint : 末年减首年
+    decadal  : 逐年序列线性回归斜率 × 10（每十年变化）
+    percent  : 相对首年的百分比变化
+    """
+    annual = annual_values(data, reduce)
+    years = annual['year'].values
+    start = years[0] if start is None else start
+    end = years[-1] if end is None else end
+    annual = annual.sel(year=slice(start, end))
+
+    values = annual.values.astype(np.float64)
+    first, last = values[0], values[-1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        percent = (last - first) / np.abs(first) * 100
+    trend = linear_trend(values, annual['year'].values - start)
+
+    dims = annual.dims[1:]
+    coords = {d: annual[d] for d in dims}
+    ds = xr.Dataset({'endpoint': (dims, last - first),
+                     'decadal': (dims, trend['slope'] * 10),
+                     'percent': (dims, percent)}, coords=coords)
+    ds.attrs.update(start=int(start), end=int(end), reduce=reduce)
+    return ds
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+import os
+import hashlib
+import numpy as np
+from pv_loader import write_atomic
+
+# 中国国界 / 省界掩膜服务：每套网格（经纬度数组 + 分辨率）只栅格化一次，
+# 布尔掩膜和格点覆盖比例保存到磁盘，之后任何分析和画图直接读取
+
+MASK_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'mask_cache')
+
+_memory = {}
+
+
+def grid_key(lon, lat):
+    # 网格定义的指纹：格点数、分辨率和坐标值
+    lon = np.asarray(lon, dtype=np.float64)
+    lat = np.asarray(lat, dtype=np.float64)
+    h = hashlib.sha1()
+    h.update(np.round(lon, 6).tobytes())
+    h.update(np.round(lat, 6).tobytes())
+    res = abs(lon[1] - lon[0]) if lon.size > 1 else 0.0
+    return f'{lon.size}x{lat.size}_{res:g}_{h.hexdigest()[:12]}'
+
+
+def load_boundaries(level='country', shapefile=None):
+    """返回 (名称列表, 几何列表)；给定 shapefile 时用 geopandas 读取，否则用 cnmaps"""
+    if shapefile is not None:
+        import geopandas as gpd
+        gdf = gpd.read_file(shapefile).to_crs(epsg=4326)  # 转换为PlateCarree坐标系
+        if level == 'country':
+            return ['China'], [gdf.geometry.union_all() if hasattr(gdf.geometry, 'union_all')
+                               else gdf.geometry.unary_union]
+        name_col = next((c for c in gdf.columns if c != 'geometry' and gdf[c].dtype == object), None)
+        names = list(gdf[name_col]) if name_col else [str(i) for i in range(len(gdf))]
+        return names, list(gdf.geometry)
+
+    from cnmaps import get_adm_maps
+    if level == 'country':
+        china = get_adm_maps(country='中华人民共和国', level='国', record='first', only_polygon=True)
+        return ['China'], [china]
+    provinces = get_adm_maps(country='中华人民共和国', level='省')
+    return list(provinces['省/直辖市']), list(provinces['geometry'])
+
+
+def _transform(lon, lat, factor=1):
+    from rasterio.transform import from_origin
+    res_x = float(abs(lon[1] - lon[0]))
+    res_y = float(abs(lat[1] - lat[0]))
+    # 栅格左上角为格点边界，而不是格点中心
+    return from_origin(float(lon.min()) - res_x / 2, float(lat.max()) + res_y / 2,
+                       res_x / factor, res_y / factor)
+
+
+def rasterize(geometry, lon, lat, all_touched=True):
+    """布尔掩膜，行顺序与 lat 数组一致"""
+    from rasterio import features
+    out = features.rasterize([(geometry, 1)], out_shape=(len(lat), len(lon)),
+                             transform=_transform(lon, lat), fill=0,
+                             all_touched=all_touched, dtype='uint8')
+    mask = out == 1
+    # 栅格从北到南排列，纬度递增时需要上下翻转
+    return np.flipud(mask) if lat[0] < lat[-1] else mask
+
+
+def coverage_fraction(geometry, lon, lat, supersample=8):
+    """每个格点被多边形覆盖的面积比例（在细网格上栅格化后块平均）"""
+    from rasterio import features
+    k = supersample
+    fine = features.rasterize([(geometry, 1)], out_shape=(len(lat) * k, len(lon) * k),
+                              transform=_transform(lon, lat, k), fill=0,
+                              all_touched=False, dtype='uint8')
+    frac = fine.reshape(len(lat), k, len(lon), k).mean(axis=(1, 3)).astype(np.float32)
+    return np.flipud(frac) if lat[0] < lat[-1] else frac
+
+
+def build_masks(lon, lat, level='country', shapefile=None, supersample=8, cache_dir=MASK_CACHE_DIR):
+    """栅格化并保存指定级别的全部掩膜，返回 {名称: (布尔掩膜, 覆盖比例)}"""
+    lon = np.asarray(lon, dtype=np.float64)
+    lat = np.asarray(lat, dtype=np.float64)
+    names, geoms = load_boundaries(level, shapefile)
+    masks = np.stack([rasterize(g, lon, lat) for g in geoms])
+    fracs = np.stack([coverage_fraction(g, lon, lat, supersample) for g in geoms])
+
+    os.makedirs(cache_dir, exist_ok=True)
+    write_atomic(_cache_file(lon, lat, level, shapefile, cache_dir),
+                 lambda f: np.savez_compressed(f, names=np.asarray(names), masks=masks, fracs=fracs))
+    return {n: (m, f) for n, m, f in zip(names, masks, fracs)}
+
+
+def _cache_file(lon, lat, level, shapefile, cache_dir):
+    source = 'cnmaps' if shapefile is None else hashlib.sha1(os.path.abspath(shapefile).encode()).hexdigest()[:8]
+    return os.path.join(cache_dir, f'{level}_{source}_{grid_key(lon, lat)}.npz')
+
+
+def load_masks(lon, lat, level='country', shapefile=None, cache_dir=MASK_CACHE_DIR):
+    """读取某一级别的全部掩膜：先查内存，再查磁盘，都没有才栅格化"""
+    path = _cache_file(lon, lat, level, shapefile, cache_dir)
+    if path in _memory:
+        return _memory[path]
+    if os.path.exists(path):
+        with np.load(path) as f:
+            masks = {str(n): (m, fr) for n, m, fr in zip(f['names'], f['masks'], f['fracs'])}
+    else:
+        masks = build_masks(lon, lat, level, shapefile, cache_dir=cache_dir)
+    _memory[path] = masks
+    return masks
+
+
+def get_china_mask(lon, lat, fractional=False, shapefile=None, cache_dir=MASK_CACHE_DIR):
+    """中国国界掩膜 (lat, lon)；fractional=True 时返回覆盖比例"""
+    mask, frac = load_masks(lon, lat, 'country', shapefile, cache_dir)['China']
+    return frac if fractional else mask
+
+
+def get_province_masks(lon, lat, fractional=False, shapefile=None, cache_dir=MASK_CACHE_DIR):
+    """各省掩膜 {省名: (lat, lon) 数组}"""
+    masks = load_masks(lon, lat, 'province', shapefile, cache_dir)
+    return {name: (frac if fractional else mask) for name, (mask, frac) in masks.items()}
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import numpy as np
+import xarray as xr
+from pv_loader import FILE_PATH, VARIABLES, open_cube, default_cache_dir, source_stamp
+
+# 季节/年平均气候态：逐年流式扫描一次数据，累加每个月的和与有效样本数，
+# 四季和全年平均都由这 12 个月的累加量得到。结果按 变量、年份范围、区域
+# 缓存到磁盘，画图脚本直接读取
+
+SEASONS = {
+    'spring': [3, 4, 5],
+    'summer': [6, 7, 8],
+    'fall': [9, 10, 11],
+    'winter': [12, 1, 2],
+    'year': list(range(1, 13)),
+}
+
+
+def region_key(region):
+    # region 为 None（全区域）或 (lat_min, lat_max, lon_min, lon_max)
+    if region is None:
+        return 'full'
+    lat_min, lat_max, lon_min, lon_max = region
+    return f'lat{lat_min:g}_{lat_max:g}_lon{lon_min:g}_{lon_max:g}'
+
+
+def select_region(da, region):
+    if region is None:
+        return da
+    lat_min, lat_max, lon_min, lon_max = region
+    return da.sel(lat=slice(lat_min, lat_max), lon=slice(lon_min, lon_max))
+
+
+def _cache_file(cache_dir, variable, years, region):
+    return os.path.join(cache_dir, f'{variable}_{years[0]}-{years[1]}_{region_key(region)}.npz')
+
+
+def accumulate(data, variables=VARIABLES, years=(2007, 2022), region=None):
+    """一次流式扫描，返回 {变量: (sum, count)}，形状均为 (month, lat, lon)"""
+    cube = {v: select_region(data[v], region).sel(year=slice(*years)) for v in variables}
+    first = cube[variables[0]]
+    shape = (first.sizes['month'], first.sizes['lat'], first.sizes['lon'])
+    acc = {v: (np.zeros(shape), np.zeros(shape, dtype=np.int32)) for v in variables}
+
+    # 外层按年循环，每年的所有变量只读取一次
+    for year in first['year'].values:
+        for v in variables:
+            block = cube[v].sel(year=year).transpose('month', 'lat', 'lon').values
+            valid = np.isfinite(block)
+            s, c = acc[v]
+            s += np.where(valid, block, 0.0)
+            c += valid
+    return acc
+
+
+def to_dataset(sums, counts, month, lat, lon):
+    """由逐月累加量得到四季、全年平均，同时保留 sum/count 以便任意月份组合"""
+    ds = xr.Dataset({'sum': (('month', 'lat', 'lon'), sums),
+                     'count': (('month', 'lat', 'lon'), counts)},
+                    coords={'month': month, 'lat': lat, 'lon': lon})
+    for name, months in SEASONS.items():
+        ds[name] = months_mean(ds, months)
+    return ds
+
+
+def months_mean(clim, months):
+    """任意月份组合的多年平均，例如 months_mean(clim, [6, 7, 8])"""
+    s = clim['sum'].sel(month=months).sum(dim='month')
+    c = clim['count'].sel(month=months).sum(dim='month')
+    return (s / c.where(c > 0)).astype(np.float32)
+
+
+def save_climatology(path, ds, variable, years, region, stamp):
+    np.savez(path, sum=ds['sum'].values, count=ds['count'].values,
+             month=ds['month'].values, lat=ds['lat'].values, lon=ds['lon'].values,
+             variable=variable, years=np.asarray(years),
+             bounds=np.asarray(region if region is not None else [], dtype=np.float64), stamp=stamp)
+
+
+def read_climatology(path):
+    with np.load(path) as f:
+        ds = to_dataset(f['sum'], f['count'], f['month'], f['lat'], f['lon'])
+        ds.attrs['stamp'] = str(f['stamp'])
+        ds.attrs['variable'] = str(f['variable'])
+        ds.attrs['years'] = tuple(int(y) for y in f['years'])
+        ds.attrs['region'] = tuple(float(b) for b in f['bounds']) or None
+    return ds
+
+
+def _current_stamp(path):
+    return json.dumps(source_stamp(path)) if os.path.exists(path) else ''
+
+
+def build_climatology(variables=VARIABLES, years=(2007, 2022), region=None,
+                      data=None, path=FILE_PATH, cache_dir=None):
+    """一次扫描计算所有变量的四季和全年平均，并写入缓存"""
+    variables = tuple(variables)
+    cache_dir = cache_dir or os.path.join(default_cache_dir(path), 'climatology')
+    os.makedirs(cache_dir, exist_ok=True)
+    if data is None:
+        data = open_cube(path)
+
+    acc = accumulate(data, variables, years, region)
+    stamp = _current_stamp(path)
+    sample = select_region(data[variables[0]], region)
+    result = {}
+    for v in variables:
+        sums, counts = acc[v]
+        ds = to_dataset(sums, counts, sample['month'].values, sample['lat'].values, sample['lon'].values)
+        save_climatology(_cache_file(cache_dir, v, years, region), ds, v, years, region, stamp)
+        result[v] = ds
+    return result
+
+
+def load_climatology(variable, years=(2007, 2022), region=None,
+                     data=None, path=FILE_PATH, cache_dir=None):
+    """读取缓存的气候态；缓存缺失或源数据已更新时，一次性为所有变量重建"""
+    cache_dir = cache_dir or os.path.join(default_cache_dir(path), 'climatology')
+    cache_file = _cache_file(cache_dir, variable, years, region)
+    if os.path.exists(cache_file):
+        ds = read_climatology(cache_file)
+        if ds.attrs['stamp'] == _current_stamp(path):
+            return ds
+
+    variables = VARIABLES if variable in VARIABLES else (variable,)
+    return build_climatology(variables, years, region, data, path, cache_dir)[variable]
+
+
+def append_climatology(new_data, path=FILE_PATH, cache_dir=None):
+    """追加新年份后更新气候态缓存
+
+    只处理结束年份正好是新数据前一年的缓存，把新年份的逐月累加量加上去，
+    另存为延长后的年份范围，返回新写入的文件列表。new_data 需已屏蔽填充值。
+    """
+    cache_dir = cache_dir or os.path.join(default_cache_dir(path), 'climatology')
+    if not os.path.isdir(cache_dir):
+        return []
+    new_years = np.sort(np.asarray(new_data['year'].values))
+    stamp = _current_stamp(path)
+
+    written = []
+    for fname in sorted(os.listdir(cache_dir)):
+        if not fname.endswith('.npz'):
+            continue
+        ds = read_climatology(os.path.join(cache_dir, fname))
+        y0, y1 = ds.attrs['years']
+        if y1 + 1 != new_years[0]:
+            continue
+        variable, region = ds.attrs['variable'], ds.attrs['region']
+        years = (y0, int(new_years[-1]))
+        sums, counts = accumulate(new_data, (variable,), (new_years[0], new_years[-1]), region)[variable]
+        extended = to_dataset(ds['sum'].values + sums, ds['count'].values + counts,
+                              ds['month'].values, ds['lat'].values, ds['lon'].values)
+        out = _cache_file(cache_dir, variable, years, region)
+        save_climatology(out, extended, variable, years, region, stamp)
+        written.append(out)
+    return written
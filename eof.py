@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import xarray as xr
+from region_weights import area_weights
+
+# EOF 分析：把 (year, month, lat, lon) 数据块整理为 (时间, 有效格点) 的距平矩阵，
+# 乘以 sqrt(cos 纬度) 做面积加权，用随机化截断 SVD 求前几个模态。
+# 只对 (时间 × 有效格点) 矩阵做矩阵乘法，不生成 格点 × 格点 的协方差矩阵
+
+
+def anomaly_matrix(data, deseason=True, min_valid=1.0):
+    """返回 (X, pixel_mask, time_coords)
+
+    X 为面积加权后的 (time, 有效格点) 距平矩阵；deseason=True 时减去逐月气候态，
+    否则减去时间平均。有效时次比例不少于 min_valid 的格点才参与分析，
+    其余缺测按距平 0 处理。
+    """
+    data = data.transpose('year', 'month', 'lat', 'lon')
+    values = data.values.astype(np.float64)
+    n_year, n_month, n_lat, n_lon = values.shape
+
+    with np.errstate(invalid='ignore'):
+        valid_frac = np.isfinite(values).mean(axis=(0, 1))
+    pixel_mask = valid_frac >= min_valid
+    pixel_mask &= valid_frac > 0
+
+    X = values[:, :, pixel_mask]  # (year, month, 有效格点)
+    counts = np.isfinite(X).sum(axis=0 if deseason else (0, 1), keepdims=True)
+    sums = np.where(np.isfinite(X), X, 0.0).sum(axis=0 if deseason else (0, 1), keepdims=True)
+    X = X - sums / np.maximum(counts, 1)
+    X = np.where(np.isfinite(X), X, 0.0).reshape(n_year * n_month, -1)
+
+    X *= np.sqrt(area_weights(data['lat'].values, data['lon'].values)[pixel_mask])
+    time = {'year': ('time', np.repeat(data['year'].values, n_month)),
+            'month': ('time', np.tile(data['month'].values, n_year))}
+    return X, pixel_mask, time
+
+
+def randomized_svd(X, n_modes, n_oversamples=10, n_iter=4, seed=0):
+    """Halko 等的随机化截断 SVD，返回前 n_modes 个 (U, s, Vt)"""
+    rng = np.random.default_rng(seed)
+    n_random = min(n_modes + n_oversamples, min(X.shape))
+    Q = X @ rng.standard_normal((X.shape[1], n_random))
+    Q, _ = np.linalg.qr(Q)
+    # 幂迭代，每步重新正交化以保持数值稳定
+    for _ in range(n_iter):
+        Q, _ = np.linalg.qr(X.T @ Q)
+        Q, _ = np.linalg.qr(X @ Q)
+    B = Q.T @ X  # (n_random, 有效格点)
+    Ub, s, Vt = np.linalg.svd(B, full_matrices=False)
+    return (Q @ Ub)[:, :n_modes], s[:n_modes], Vt[:n_modes]
+
+
+def eof(data, n_modes=3, deseason=True, min_valid=1.0, **kwargs):
+    """返回前 n_modes 个 EOF 模态的 Dataset
+
+    pattern            : (mode, lat, lon)，去掉面积权重后的空间型，单位同 data
+    pc                 : (mode, time)，方差为 1 的时间系数
+    explained_variance : (mode,)，解释方差比例
+    pattern × pc 即为该模态重建的距平场。
+    """
+    X, pixel_mask, time = anomaly_matrix(data, deseason, min_valid)
+    U, s, Vt = randomized_svd(X, n_modes, **kwargs)
+    n_time = X.shape[0]
+
+    # 统一符号：空间型加权和为正
+    sign = np.sign(Vt.sum(axis=1))
+    sign[sign == 0] = 1
+    U *= sign
+    Vt *= sign[:, None]
+
+    pc_std = s / np.sqrt(n_time)
+    pc = U.T * np.sqrt(n_time)
+    weights = np.sqrt(area_weights(data['lat'].values, data['lon'].values)[pixel_mask])
+    pattern = np.full((len(s),) + pixel_mask.shape, np.nan)
+    pattern[:, pixel_mask] = Vt * pc_std[:, None] / weights
+
+    explained = s ** 2 / (X * X).sum()
+    coords = {'mode': np.arange(1, len(s) + 1), 'lat': data['lat'], 'lon': data['lon'], **time}
+    return xr.Dataset({'pattern': (('mode', 'lat', 'lon'), pattern),
+                       'pc': (('mode', 'time'), pc),
+                       'explained_variance': (('mode',), explained)}, coords=coords)
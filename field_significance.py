@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+
+import os
+import numpy as np
+import xarray as xr
+from pixel_corr import _as_time_pixel, pixel_pearsonr
+from parallel import run_parallel
+
+# 场显著性检验：逐格点独立检验在成千上万个格点上会产生大量假阳性。
+# 这里对所有格点同时做（块）置换检验，每次置换的下标在整个网格上共用，
+# 再用 Benjamini-Hochberg 方法控制错误发现率（FDR）。
+# 置换按组分给多个进程并行计算（parallel.run_parallel）。
+# 注意：Windows 下多进程计算时，调用脚本需放在 if __name__ == '__main__': 之下
+
+
+def bh_fdr(p, alpha=0.05):
+    """Benjamini-Hochberg 校正，返回 (q, significant)，NaN 格点不参与排序"""
+    p = np.asarray(p, dtype=np.float64)
+    q = np.full(p.shape, np.nan)
+    valid = np.isfinite(p)
+    pv = p[valid]
+    m = pv.size
+    if m == 0:
+        return q, np.zeros(p.shape, dtype=bool)
+    order = np.argsort(pv)
+    ranked = pv[order] * m / np.arange(1, m + 1)
+    # 从大到小取累积最小值，保证 q 单调
+    ranked = np.minimum.accumulate(ranked[::-1])[::-1]
+    q_valid = np.empty(m)
+    q_valid[order] = np.minimum(ranked, 1.0)
+    q[valid] = q_valid
+    return q, np.where(valid, q <= alpha, False)
+
+
+def block_permutations(n_time, n_perm, block=1, seed=0):
+    """返回 (n_perm, n_time) 的置换下标；以长度为 block 的连续时次为整体打乱，
+    保留块内的自相关（如 block=3 对应每年夏季的 6-8 月）"""
+    rng = np.random.default_rng(seed)
+    starts = np.arange(0, n_time, block)
+    blocks = [np.arange(s, min(s + block, n_time)) for s in starts]
+    return np.stack([np.concatenate([blocks[k] for k in rng.permutation(len(blocks))])
+                     for _ in range(n_perm)])
+
+
+def _exceed_counts(x, y, r_obs, indices, alpha):
+    # 进程池的工作函数：统计一组置换中 |r| 不小于观测值的次数，以及每次置换的局地显著格点数
+    counts = np.zeros(r_obs.shape, dtype=np.int64)
+    n_local = np.empty(len(indices), dtype=np.int64)
+    with np.errstate(invalid='ignore'):
+        for i, idx in enumerate(indices):
+            r, _, p, _ = pixel_pearsonr(x, y[idx])
+            counts += np.abs(r) >= np.abs(r_obs)
+            n_local[i] = np.sum(p < alpha)
+    return counts, n_local
+
+
+def permutation_test(x, y, n_perm=1000, block=1, alpha=0.05, seed=0, processes=None):
+    """x、y 为 (time..., lat, lon)，对所有格点同时做置换检验，返回 Dataset：
+
+    r       : 观测相关系数
+    p_local : 逐格点 t 检验的 p 值
+    p_perm  : 置换检验 p 值，(1 + 超过次数) / (1 + n_perm)
+    q       : p_perm 的 BH-FDR 校正值，significant = q <= alpha
+    attrs['field_p'] 为整场显著性：置换中局地显著格点数不少于观测值的比例。
+    processes 为进程数，None 表示使用全部 CPU，1 表示不开进程池。
+    """
+    coords = None
+    if isinstance(y, xr.DataArray):
+        coords = {'lat': y['lat'], 'lon': y['lon']}
+    x = _as_time_pixel(x)
+    y = _as_time_pixel(y)
+    r_obs, _, p_local, _ = pixel_pearsonr(x, y)
+    indices = block_permutations(x.shape[0], n_perm, block, seed)
+
+    n_chunks = processes or os.cpu_count() or 1
+    chunks = np.array_split(indices, min(n_chunks, n_perm))
+    results = run_parallel(_exceed_counts, [(x, y, r_obs, chunk, alpha) for chunk in chunks], processes)
+
+    counts = sum(c for c, _ in results)
+    n_local = np.concatenate([n for _, n in results])
+    p_perm = (1 + counts) / (1 + n_perm)
+    p_perm = np.where(np.isfinite(r_obs), p_perm, np.nan)
+    q, significant = bh_fdr(p_perm, alpha)
+
+    dims = ('lat', 'lon')
+    ds = xr.Dataset({'r': (dims, r_obs), 'p_local': (dims, p_local), 'p_perm': (dims, p_perm),
+                     'q': (dims, q), 'significant': (dims, significant)}, coords=coords)
+    observed = np.sum(p_local < alpha)
+    ds.attrs.update(n_perm=n_perm, block=block, alpha=alpha,
+                    field_p=float((1 + np.sum(n_local >= observed)) / (1 + n_perm)))
+    return ds
+
+
+def trend_permutation_test(y, n_perm=1000, alpha=0.05, seed=0, processes=None):
+    """逐年序列 (year, lat, lon) 趋势的置换检验：趋势显著等价于与年份的相关显著"""
+    n_year = y.shape[0]
+    years = np.broadcast_to(np.arange(n_year, dtype=np.float64)[:, None, None], (n_year,) + y.shape[-2:])
+    return permutation_test(years, y, n_perm, block=1, alpha=alpha, seed=seed, processes=processes)
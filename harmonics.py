@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import xarray as xr
+from pv_loader import FILE_PATH, VARIABLES
+from climatology import load_climatology
+
+# 季节循环的谐波分析：对多年平均的 12 个月循环沿月份轴做一次 rfft，
+# 同时得到年周期（k=1）、半年周期（k=2）等谐波的振幅、峰值月份和解释方差。
+# 多个变量叠成一个数组，只调用一次 rfft，代替逐个季节挑选月份求平均
+#   x(m) = mean + Σ A_k cos(2πk(m - m_k)/12)
+
+
+def harmonics(cycle, n_harmonics=2, first_month=1):
+    """cycle 为 (..., month, lat, lon) 的数组，月份轴为倒数第三维
+
+    返回字典：mean (..., lat, lon)，amplitude、peak_month、explained_variance
+    均为 (..., harmonic, lat, lon)。任一月份缺测的格点结果为 NaN。
+    peak_month 为该谐波在第一个周期内取最大值的月份（可为小数，1 表示 1 月中）。
+    """
+    cycle = np.moveaxis(np.asarray(cycle, dtype=np.float64), -3, -1)  # 月份轴放到最后
+    n = cycle.shape[-1]
+    spec = np.fft.rfft(cycle, axis=-1)
+    power = np.abs(spec) ** 2
+    # Parseval：去掉均值后的方差，Nyquist 项只计一次
+    weight = np.full(spec.shape[-1], 2.0)
+    weight[0] = 0.0
+    if n % 2 == 0:
+        weight[-1] = 1.0
+    total = (power * weight).sum(axis=-1) / n ** 2
+
+    k = np.arange(1, n_harmonics + 1)
+    amp = weight[k] * np.abs(spec[..., k]) / n
+    phase = np.angle(spec[..., k])
+    # A_k cos(2πk m/n + θ_k) 在 m = -θ_k n / (2πk) 处取最大值
+    peak = np.mod(-phase * n / (2 * np.pi * k), n / k) + first_month
+    with np.errstate(invalid='ignore', divide='ignore'):
+        explained = weight[k] * power[..., k] / n ** 2 / total[..., None]
+
+    move = lambda a: np.moveaxis(a, -1, -3)
+    return {'mean': spec[..., 0].real / n, 'amplitude': move(amp),
+            'peak_month': move(peak), 'explained_variance': move(explained)}
+
+
+def harmonic_maps(variables=VARIABLES, n_harmonics=2, years=(2007, 2022), region=None,
+                  data=None, path=FILE_PATH, cache_dir=None):
+    """由缓存的逐月气候态计算各变量季节循环的谐波图，返回带 variable、harmonic 维的 Dataset"""
+    cycles = []
+    for v in variables:
+        clim = load_climatology(v, years, region, data, path, cache_dir)
+        cycles.append((clim['sum'] / clim['count'].where(clim['count'] > 0)).transpose('month', 'lat', 'lon'))
+    ref = cycles[0]
+    result = harmonics(np.stack([c.values for c in cycles]), n_harmonics, int(ref['month'].values[0]))
+
+    coords = {'variable': list(variables), 'harmonic': np.arange(1, n_harmonics + 1),
+              'lat': ref['lat'], 'lon': ref['lon']}
+    dims = ('variable', 'harmonic', 'lat', 'lon')
+    return xr.Dataset({'mean': (('variable', 'lat', 'lon'), result['mean']),
+                       'amplitude': (dims, result['amplitude']),
+                       'peak_month': (dims, result['peak_month']),
+                       'explained_variance': (dims, result['explained_variance'])}, coords=coords)
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+import os
+import numpy as np
+import xarray as xr
+from pv_loader import FILE_PATH, VARIABLES, open_cube, default_cache_dir, append_years, mask_fill
+from climatology import append_climatology, region_key, select_region, _current_stamp
+from suff_stats import append_store
+from pixel_trend import TREND_SUMS, annual_series, trend_sums, trend_from_sums
+
+# 增量更新：新的一年（如 2023 年）数据到来时，只读取这一年的切片，
+# 依次更新 .npy 数据缓存、气候态、逐格点趋势累加量和相关分析的充分统计量，
+# 只改写受影响的产品，不再从 2007 年重新计算
+
+
+def _trend_dir(path, cache_dir):
+    return cache_dir or os.path.join(default_cache_dir(path), 'trend')
+
+
+def _trend_file(cache_dir, variable, years, region):
+    return os.path.join(cache_dir, f'{variable}_{years[0]}-{years[1]}_{region_key(region)}.npz')
+
+
+def _save_trend_state(trend_file, state):
+    np.savez(trend_file, **state)
+
+
+def _read_trend_state(trend_file):
+    with np.load(trend_file) as f:
+        return {k: f[k] for k in f.files}
+
+
+def build_trend_state(variable, years=(2007, 2022), region=None, data=None, path=FILE_PATH, cache_dir=None):
+    """由 years 范围内的年平均序列建立趋势累加量（x 为相对首年的年数）"""
+    cache_dir = _trend_dir(path, cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    if data is None:
+        data = open_cube(path)
+    da = select_region(data[variable], region).sel(year=slice(*years))
+    series = annual_series(da).transpose('year', 'lat', 'lon')
+    base = int(series['year'].values[0])
+    state = trend_sums(series.values, series['year'].values - base)
+    state.update(variable=variable, years=series['year'].values, base=base,
+                 lat=series['lat'].values, lon=series['lon'].values,
+                 bounds=np.asarray(region if region is not None else [], dtype=np.float64),
+                 stamp=_current_stamp(path))
+    _save_trend_state(_trend_file(cache_dir, variable, years, region), state)
+    return state
+
+
+def load_trend(variable, years=(2007, 2022), region=None, data=None, path=FILE_PATH, cache_dir=None):
+    """读取（必要时建立）years 范围内的趋势累加量，返回逐格点趋势 Dataset，斜率单位为每年
+
+    缓存缺失或源数据已更新时重建，与 climatology.load_climatology 相同。
+    """
+    trend_file = _trend_file(_trend_dir(path, cache_dir), variable, years, region)
+    state = None
+    if os.path.exists(trend_file):
+        state = _read_trend_state(trend_file)
+        if str(state['stamp']) != _current_stamp(path):
+            state = None
+    if state is None:
+        state = build_trend_state(variable, years, region, data, path, cache_dir)
+    result = trend_from_sums({k: state[k] for k in TREND_SUMS})
+    coords = {'lat': state['lat'], 'lon': state['lon']}
+    ds = xr.Dataset({k: (('lat', 'lon'), v) for k, v in result.items()}, coords=coords)
+    ds.attrs['years'] = (int(state['years'][0]), int(state['years'][-1]))
+    return ds
+
+
+def append_trend_states(new_data, path=FILE_PATH, cache_dir=None):
+    """把新年份的年平均值加到趋势累加量上，返回新写入的文件列表
+
+    与 append_climatology 相同，只处理结束年份正好是新数据前一年的缓存，
+    另存为延长后的年份范围。
+    """
+    cache_dir = _trend_dir(path, cache_dir)
+    if not os.path.isdir(cache_dir):
+        return []
+    new_years = np.sort(np.asarray(new_data['year'].values))
+    stamp = _current_stamp(path)
+
+    written = []
+    for fname in sorted(os.listdir(cache_dir)):
+        if not fname.endswith('.npz'):
+            continue
+        state = _read_trend_state(os.path.join(cache_dir, fname))
+        y0, y1 = int(state['years'][0]), int(state['years'][-1])
+        if y1 + 1 != new_years[0]:
+            continue
+        variable = str(state['variable'])
+        region = tuple(float(b) for b in state['bounds']) or None
+        new = annual_series(select_region(new_data[variable], region)).transpose('year', 'lat', 'lon')
+        add = trend_sums(new.values, new['year'].values - int(state['base']))
+        for k in TREND_SUMS:
+            state[k] = state[k] + add[k]
+        state['years'] = np.concatenate([state['years'], new['year'].values])
+        state['stamp'] = stamp
+        out = _trend_file(cache_dir, variable, (y0, int(new_years[-1])), region)
+        _save_trend_state(out, state)
+        written.append(out)
+    return written
+
+
+def append_new_year(new_file, years=None, path=FILE_PATH, cache_dir=None):
+    """读取 new_file 中的新年份并增量更新所有缓存产品
+
+    new_file 可以是只含新年份的 NetCDF，也可以是延长后的完整文件（此时用 years 指定新年份）。
+    返回 {产品: 更新的文件列表}。
+    """
+    cache_dir = cache_dir or default_cache_dir(path)
+    source = xr.open_dataset(new_file)
+    if years is not None:
+        source = source.sel(year=np.atleast_1d(years))
+    new_data = xr.Dataset({v: mask_fill(source[v]) for v in VARIABLES if v in source}).load()
+    source.close()
+
+    append_years(new_data, path, cache_dir)
+    return {
+        'climatology': append_climatology(new_data, path, os.path.join(cache_dir, 'climatology')),
+        'trend': append_trend_states(new_data, path, os.path.join(cache_dir, 'trend')),
+        'suff_stats': append_store(new_data, path, os.path.join(cache_dir, 'suff_stats')),
+    }
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import xarray as xr
+from pixel_corr import pixel_pearsonr
+from pixel_trend import linear_trend
+
+# 去趋势与超前滞后相关：把 (year, month, lat, lon) 拼成连续的逐月序列，
+# 去掉季节循环和逐格点线性趋势后，一次求出 -3..+3 个月所有滞后的相关图。
+# 每个滞后只是同一组距平数组错开若干个月的切片视图，不复制数据、不逐格点调用 pearsonr
+
+LAGS = range(-3, 4)
+
+
+def monthly_series(data):
+    """(year, month, lat, lon) → (time, lat, lon) 的连续逐月数组"""
+    data = data.transpose('year', 'month', 'lat', 'lon')
+    values = data.values.astype(np.float64)
+    return values.reshape((-1,) + values.shape[-2:])
+
+
+def detrend(series, n_month=12, deseason=True):
+    """逐格点减去逐月气候态（deseason=True）并去掉线性趋势，series 为 (time, lat, lon)"""
+    series = np.array(series, dtype=np.float64)
+    if deseason:
+        by_month = series.reshape((-1, n_month) + series.shape[-2:])
+        with np.errstate(invalid='ignore'):
+            valid = np.isfinite(by_month)
+            clim = np.where(valid, by_month, 0.0).sum(axis=0) / valid.sum(axis=0)
+        series = (by_month - clim).reshape(series.shape)
+    t = np.arange(series.shape[0], dtype=np.float64)
+    trend = linear_trend(series, t)
+    fit = trend['intercept'] + trend['slope'] * t[:, None, None]
+    # 无法拟合趋势的格点（有效时次太少）只去季节循环
+    return series - np.where(np.isfinite(fit), fit, 0.0)
+
+
+def lagged_corr(x, y, lags=LAGS, detrended=True, min_count=3):
+    """x、y 为 (year, month, lat, lon) 的 DataArray，返回带 lag 维的 r、p、n
+
+    lag > 0 表示 x 超前 y：r(lag) = corr(x[t], y[t + lag])。
+    detrended=False 时直接使用原始逐月值。
+    """
+    xs = monthly_series(x)
+    ys = monthly_series(y)
+    if detrended:
+        n_month = x.sizes['month']
+        xs = detrend(xs, n_month)
+        ys = detrend(ys, n_month)
+
+    n_time = xs.shape[0]
+    lags = list(lags)
+    r = np.full((len(lags),) + xs.shape[1:], np.nan)
+    p = np.full_like(r, np.nan)
+    n = np.zeros(r.shape, dtype=np.int64)
+    for i, lag in enumerate(lags):
+        if abs(lag) >= n_time:
+            continue
+        if lag >= 0:
+            xl, yl = xs[:n_time - lag], ys[lag:]
+        else:
+            xl, yl = xs[-lag:], ys[:n_time + lag]
+        r[i], _, p[i], n[i] = pixel_pearsonr(xl, yl, min_count)
+
+    dims = ('lag', 'lat', 'lon')
+    coords = {'lag': lags, 'lat': x['lat'], 'lon': x['lon']}
+    ds = xr.Dataset({'r': (dims, r), 'p': (dims, p), 'n': (dims, n)}, coords=coords)
+    ds.attrs['detrended'] = int(detrended)
+    return ds
+
+
+def best_lag(ds):
+    """每个格点 |r| 最大的滞后及对应的 r"""
+    score = np.abs(ds['r']).fillna(-1)
+    index = score.argmax(dim='lag')
+    lag = ds['lag'][index].where(ds['r'].notnull().any(dim='lag'))
+    return lag, ds['r'].isel(lag=index)
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import xarray as xr
+from matplotlib import animation
+from pv_loader import FILE_PATH, open_cube
+from pixel_stats import value_range
+from panel_grid import PanelGrid
+from base_map import CHINA_EXTENT
+
+# 逐月动画导出（GIF / MP4）：底图、坐标轴和色标只画一次，每帧只对 QuadMesh 调用 set_array，
+# 帧按下标逐个从数据中读取，画完立即交给编码器（ffmpeg 管道），不在内存中保存所有帧。
+# 支持 PV_2007_2016.nc 数据块（year × month 共 192 帧）和 ERA5 逐月气压层文件
+
+ERA5_FILE = r'C:\Users\Chen Yong\Desktop\InnovationProgram\ERA5 monthly averaged data on pressure levels of 2023.nc'
+
+
+def cube_frames(variable, years=None, path=FILE_PATH, data=None):
+    """PV 数据块的逐月帧：返回 (frame, lat, lon) 的 DataArray，frame 坐标 title 为每帧标题
+
+    只是原数据块的视图，帧在导出时才逐个读取。
+    """
+    if data is None:
+        data = open_cube(path, variables=[variable])
+    da = data[variable]
+    if years is not None:
+        da = da.sel(year=slice(*years))
+    da = da.transpose('year', 'month', 'lat', 'lon')
+    titles = [f'{variable} {int(y)}-{int(m):02d}' for y in da['year'].values for m in da['month'].values]
+    values = da.data.reshape((-1,) + da.shape[2:])
+    return xr.DataArray(values, dims=('frame', 'lat', 'lon'),
+                        coords={'title': ('frame', titles), 'lat': da['lat'], 'lon': da['lon']}, name=variable)
+
+
+def era5_frames(variable='u', level=100, path=ERA5_FILE):
+    """ERA5 逐月气压层文件 (date, pressure_level, latitude, longitude) 的逐月帧，格式同 cube_frames"""
+    da = xr.open_dataset(path)[variable].sel(pressure_level=level)
+    da = da.rename(date='frame', latitude='lat', longitude='lon').transpose('frame', 'lat', 'lon')
+    # date 坐标为 int64 的 YYYYMMDD
+    titles = [f'{variable} {level:g} hPa {d // 10000}-{d // 100 % 100:02d}' for d in da['frame'].values.astype(np.int64)]
+    return da.assign_coords(title=('frame', titles))
+
+
+def _writer(filename, fps):
+    # 优先用 ffmpeg 管道逐帧编码；没有 ffmpeg 时 GIF 退回 PillowWriter（会在内存中缓存帧）
+    if animation.writers.is_available('ffmpeg'):
+        return animation.FFMpegWriter(fps=fps)
+    if filename.lower().endswith('.gif'):
+        return animation.PillowWriter(fps=fps)
+    raise RuntimeError('导出 MP4 需要安装 ffmpeg')
+
+
+def export_animation(frames, filename, levels=None, cmap='jet', fps=4, dpi=150,
+                     extent=CHINA_EXTENT, layers=('coastline', 'borders', 'china'),
+                     label=None, figsize=(10, 8)):
+    """把 cube_frames / era5_frames 得到的帧导出为 GIF 或 MP4，返回帧数
+
+    levels 不给时先流式扫描一遍求取值范围，取 21 个等级。
+    """
+    if levels is None:
+        vmin, vmax = value_range(frames, 'frame')
+        levels = np.linspace(vmin, vmax if vmax > vmin else vmin + 1.0, 21)
+
+    grid = PanelGrid(frames['lon'].values, frames['lat'].values, 1, 1, levels, cmap, extent=extent,
+                     layers=layers, figsize=figsize, colorbar_label=label,
+                     colorbar_kw={'orientation': 'vertical', 'aspect': 30})
+    writer = _writer(filename, fps)
+    titles = frames['title'].values
+    with writer.saving(grid.fig, filename, dpi):
+        for k in range(frames.sizes['frame']):
+            grid.set_panel(0, frames.isel(frame=k).values, titles[k])
+            writer.grab_frame()
+    return frames.sizes['frame']
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import cartopy.crs as ccrs
+from matplotlib import colormaps
+from matplotlib.colors import BoundaryNorm, ListedColormap
+from china_mask import get_china_mask
+
+# 栅格渲染：把格点场直接画成 pcolormesh 栅格，代替 256 层 contourf 加 clip_contours_by_map。
+# 中国国界裁剪改用 china_mask 缓存的格点掩膜（只算一次），
+# 离散色阶用 BoundaryNorm 实现，主图和南海小图共用同一个掩膜数组
+
+
+def discrete_cmap(cmap, levels):
+    """把连续色带按 levels 切成离散色阶，返回 (cmap, norm)"""
+    if isinstance(cmap, str):
+        cmap = colormaps[cmap]
+    levels = np.asarray(levels, dtype=np.float64)
+    n = len(levels) - 1
+    colors = cmap(np.linspace(0, 1, n))
+    return ListedColormap(colors), BoundaryNorm(levels, n)
+
+
+def cell_edges(coord):
+    """由格点中心坐标求格点边界（长度 n + 1），供 pcolormesh 使用"""
+    coord = np.asarray(coord, dtype=np.float64)
+    if coord.size == 1:
+        return np.array([coord[0] - 0.5, coord[0] + 0.5])
+    mid = (coord[:-1] + coord[1:]) / 2
+    return np.concatenate([[2 * coord[0] - mid[0]], mid, [2 * coord[-1] - mid[-1]]])
+
+
+def clip_mask(lon, lat, shapefile=None, min_fraction=None):
+    """中国范围的格点掩膜；min_fraction 不为 None 时按格点覆盖比例取舍"""
+    if min_fraction is None:
+        return get_china_mask(lon, lat, shapefile=shapefile)
+    return get_china_mask(lon, lat, fractional=True, shapefile=shapefile) >= min_fraction
+
+
+def masked_field(data, mask=None):
+    """把 NaN 和掩膜外的格点屏蔽，不复制数据"""
+    data = np.asarray(data)
+    invalid = ~np.isfinite(data)
+    if mask is not None:
+        invalid |= ~mask
+    return np.ma.masked_array(data, mask=invalid)
+
+
+def draw_raster(ax, lon, lat, field, cmap, levels, transform=ccrs.PlateCarree(), **kwargs):
+    """在 ax 上画离散色阶的栅格场，返回 QuadMesh（可直接传给 fig.colorbar）"""
+    cmap, norm = discrete_cmap(cmap, levels)
+    return ax.pcolormesh(cell_edges(lon), cell_edges(lat), field, cmap=cmap, norm=norm,
+                         transform=transform, shading='flat', rasterized=True, **kwargs)
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import matplotlib.pyplot as plt
+import cartopy.crs as ccrs
+from map_render import draw_raster
+from base_map import add_layers
+
+# 多子图地图模板：投影坐标轴、海岸线 / 国界和色标只建一次，
+# 每个子图预先放一个全屏蔽的 QuadMesh，之后换数据只调用 set_array，
+# 多子图拼图和动画的开销接近单张地图
+
+
+class PanelGrid:
+    """nrows × ncols 的地图子图网格，所有子图共用同一套色阶和一个色标
+
+    grid = PanelGrid(lon, lat, 3, 4, levels=np.linspace(-20, 20, 21), cmap='coolwarm')
+    for i in range(12):
+        grid.set_panel(i, u[i], f'Month {i + 1}')
+    """
+
+    def __init__(self, lon, lat, nrows, ncols, levels, cmap='jet', extent=None,
+                 layers=('coastline',), figsize=None, colorbar_label=None,
+                 colorbar_kw=None, projection=ccrs.PlateCarree()):
+        self.lon = np.asarray(lon)
+        self.lat = np.asarray(lat)
+        self.fig, axes = plt.subplots(nrows, ncols, figsize=figsize or (5 * ncols, 4 * nrows),
+                                      subplot_kw={'projection': projection}, squeeze=False)
+        self.axes = axes.ravel()
+        empty = np.ma.masked_all((self.lat.size, self.lon.size))
+        self.meshes = []
+        for ax in self.axes:
+            self.meshes.append(draw_raster(ax, self.lon, self.lat, empty, cmap, levels))
+            add_layers(ax, layers)
+            if extent is not None:
+                ax.set_extent(extent, crs=ccrs.PlateCarree())
+        kw = dict(orientation='horizontal', pad=0.02, aspect=50, extend='both')
+        kw.update(colorbar_kw or {})
+        self.colorbar = self.fig.colorbar(self.meshes[0], ax=list(self.axes), **kw)
+        if colorbar_label:
+            self.colorbar.set_label(colorbar_label)
+
+    def set_panel(self, i, field, title=None, **title_kw):
+        """替换第 i 个子图的数据（(lat, lon) 数组，NaN 不显示）"""
+        self.meshes[i].set_array(np.ma.masked_invalid(np.asarray(field)))
+        if title is not None:
+            self.axes[i].set_title(title, **title_kw)
+        return self.meshes[i]
+
+    def set_panels(self, fields, titles=None, **title_kw):
+        titles = titles if titles is not None else [None] * len(fields)
+        for i, (field, title) in enumerate(zip(fields, titles)):
+            self.set_panel(i, field, title, **title_kw)
+
+    def save(self, filename, **kwargs):
+        self.fig.savefig(filename, **kwargs)
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+import os
+import warnings
+import traceback
+import multiprocessing as mp
+
+# 简单的进程池：每个子进程处理一组任务，结果经 Pipe 传回。
+# 不用 concurrent.futures / multiprocessing.Pool，它们都要导入标准库 queue，
+# 而仓库根目录下的 queue.py 会遮蔽它；multiprocessing.Process + Pipe 不依赖 queue。
+# 子进程无法启动时给出警告并退回串行计算。
+# Windows 下调用脚本需放在 if __name__ == '__main__': 之下
+
+
+def _worker(conn, func, jobs):
+    # 子进程：依次计算 (序号, 参数) 任务，把 [(序号, 结果)] 或错误信息发回父进程
+    try:
+        conn.send(('ok', [(i, func(*args)) for i, args in jobs]))
+    except Exception:
+        conn.send(('error', traceback.format_exc()))
+    finally:
+        conn.close()
+
+
+def run_parallel(func, jobs, processes=None):
+    """对 jobs 中的每个参数元组计算 func(*args)，返回与 jobs 同序的结果列表
+
+    processes 为进程数，None 表示使用全部 CPU，1 表示在当前进程中串行计算。
+    func 必须是模块级函数（子进程需要能 pickle 它）。
+    """
+    jobs = [tuple(args) for args in jobs]
+    processes = min(processes or os.cpu_count() or 1, len(jobs))
+    if processes <= 1:
+        return [func(*args) for args in jobs]
+
+    groups = [list(enumerate(jobs))[k::processes] for k in range(processes)]
+    workers = []
+    try:
+        for group in groups:
+            recv, send = mp.Pipe(duplex=False)
+            proc = mp.Process(target=_worker, args=(send, func, group))
+            proc.start()
+            send.close()
+            workers.append((proc, recv))
+    except (OSError, ImportError, RuntimeError) as err:
+        for proc, recv in workers:
+            proc.terminate()
+            recv.close()
+        warnings.warn(f'无法启动子进程（{err}），改为串行计算')
+        return [func(*args) for args in jobs]
+
+    results = [None] * len(jobs)
+    errors = []
+    # 先接收再 join，避免结果较大时子进程阻塞在 Pipe 上
+    for proc, recv in workers:
+        try:
+            status, payload = recv.recv()
+        except EOFError:
+            status, payload = 'error', f'子进程 {proc.pid} 异常退出'
+        recv.close()
+        proc.join()
+        if status == 'ok':
+            for i, value in payload:
+                results[i] = value
+        else:
+            errors.append(payload)
+    if errors:
+        raise RuntimeError('并行计算出错：\n' + '\n'.join(errors))
+    return results
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import xarray as xr
+from scipy import stats
+from pv_loader import mask_fill
+
+# 逐格点相关分析：一次性对整个 (year×month, lat, lon) 数据块计算 r、t 和 p，
+# 代替逐格点调用 pearsonr 的双重循环
+
+
+def _as_time_pixel(data):
+    # 把 (year, month, lat, lon) 或 (time, lat, lon) 展平成 (time, lat, lon)
+    if isinstance(data, xr.DataArray):
+        data = data.values
+    data = np.asarray(data, dtype=np.float64)
+    if data.ndim < 3:
+        raise ValueError('数据至少需要 (time, lat, lon) 三个维度')
+    return data.reshape((-1,) + data.shape[-2:])
+
+
+def pixel_pearsonr(x, y, min_count=2):
+    """逐格点 Pearson 相关，返回 (r, t, p, n) 四个 (lat, lon) 数组"""
+    x = _as_time_pixel(x)
+    y = _as_time_pixel(y)
+    if x.shape != y.shape:
+        raise ValueError(f'x 与 y 形状不一致: {x.shape} vs {y.shape}')
+
+    # 与原脚本的 valid 逻辑一致：两个序列同时非 NaN 的时次才参与计算
+    valid = np.isfinite(x) & np.isfinite(y)
+    n = valid.sum(axis=0)
+    n_safe = np.maximum(n, 1)
+
+    # 两遍法：先求均值再求离差平方和，避免大数相减损失精度
+    x_mean = np.where(valid, x, 0.0).sum(axis=0) / n_safe
+    y_mean = np.where(valid, y, 0.0).sum(axis=0) / n_safe
+    dx = np.where(valid, x - x_mean, 0.0)
+    dy = np.where(valid, y - y_mean, 0.0)
+    sxx = (dx * dx).sum(axis=0)
+    syy = (dy * dy).sum(axis=0)
+    sxy = (dx * dy).sum(axis=0)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        r = sxy / np.sqrt(sxx * syy)
+        r = np.clip(r, -1.0, 1.0)
+        df = n - 2
+        t = r * np.sqrt(df / (1.0 - r * r))
+        p = 2 * stats.t.sf(np.abs(t), df)
+
+    # 只有两个样本时 r 必为 ±1，与 pearsonr 一样给 p = 1
+    p = np.where(df == 0, 1.0, p)
+
+    # 有效样本不足或序列为常数的格点置为 NaN
+    bad = (n < max(min_count, 2)) | (sxx == 0) | (syy == 0)
+    r[bad] = np.nan
+    t[bad] = np.nan
+    p[bad] = np.nan
+    return r, t, p, n
+
+
+def corr_by_months(x, y, months, years=slice(2007, 2022), min_count=2):
+    """选取任意月份组合和年份范围后计算逐格点相关，返回带坐标的 Dataset"""
+    x = x.sel(year=years, month=months)
+    y = y.sel(year=years, month=months)
+    # 将填充值设置为NaN
+    x = mask_fill(x)
+    y = mask_fill(y)
+
+    r, t, p, n = pixel_pearsonr(x.transpose(..., 'lat', 'lon'),
+                                y.transpose(..., 'lat', 'lon'),
+                                min_count=min_count)
+    coords = {'lat': x['lat'], 'lon': x['lon']}
+    dims = ('lat', 'lon')
+    return xr.Dataset({'r': (dims, r), 't': (dims, t),
+                       'p': (dims, p), 'n': (dims, n)}, coords=coords)
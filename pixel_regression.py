@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import xarray as xr
+from scipy import stats
+
+# 逐格点多元线性回归：例如 PVpot ~ AOD + DSW + Tas + Wind。
+# 所有格点的正规方程一起组装，用一次批量 np.linalg.inv 求解，
+# 输出回归系数、标准误差、p 值、偏相关系数和 R²。每个格点按自己的缺测分别剔除时次
+
+
+def _flatten(a):
+    if isinstance(a, xr.DataArray):
+        a = a.values
+    a = np.asarray(a, dtype=np.float64)
+    return a.reshape((-1, a.shape[-2] * a.shape[-1])), a.shape[-2:]
+
+
+def pixel_regression(y, predictors, min_df=1):
+    """y 与每个预报因子均为 (time..., lat, lon)，返回逐格点回归结果的字典
+
+    结果中 coef、stderr、t、p、partial_r 的形状为 (k, lat, lon)，
+    intercept、r2、n 的形状为 (lat, lon)。残差自由度小于 min_df
+    或预报因子共线的格点结果为 NaN。
+    """
+    y, grid = _flatten(y)
+    X = np.stack([_flatten(x)[0] for x in predictors], axis=-1)  # (T, P, k)
+    k = X.shape[-1]
+
+    # 同一时次 y 和所有因子都有效才参与回归
+    valid = np.isfinite(y) & np.isfinite(X).all(axis=-1)
+    n = valid.sum(axis=0)
+    n_safe = np.maximum(n, 1)
+
+    # 逐格点中心化，截距不进入方程组，改善条件数
+    x_mean = np.where(valid[..., None], X, 0.0).sum(axis=0) / n_safe[:, None]
+    y_mean = np.where(valid, y, 0.0).sum(axis=0) / n_safe
+    Xc = np.where(valid[..., None], X - x_mean, 0.0)
+    yc = np.where(valid, y - y_mean, 0.0)
+
+    A = np.einsum('tpi,tpj->pij', Xc, Xc)
+    b = np.einsum('tpi,tp->pi', Xc, yc)
+
+    # 按列尺度归一化后再求逆
+    scale = np.sqrt(np.einsum('pii->pi', A))
+    df = n - k - 1
+    ok = (df >= min_df) & (scale > 0).all(axis=1)
+    scale_safe = np.where(scale > 0, scale, 1.0)
+    As = A / (scale_safe[:, :, None] * scale_safe[:, None, :])
+    As[~ok] = np.eye(k)
+    ok &= np.linalg.cond(As) < 1e10
+    As[~ok] = np.eye(k)
+
+    inv = np.linalg.inv(As) / (scale_safe[:, :, None] * scale_safe[:, None, :])
+    coef = np.einsum('pij,pj->pi', inv, b)
+
+    resid = yc - np.einsum('tpi,pi->tp', Xc, coef)
+    resid = np.where(valid, resid, 0.0)
+    sse = (resid * resid).sum(axis=0)
+    syy = (yc * yc).sum(axis=0)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sigma2 = sse / df
+        stderr = np.sqrt(sigma2[:, None] * np.einsum('pii->pi', inv))
+        t = coef / stderr
+        p = 2 * stats.t.sf(np.abs(t), df[:, None])
+        # 偏相关系数与 t 统计量的关系：r = t / sqrt(t² + df)
+        partial_r = t / np.sqrt(t * t + df[:, None])
+        r2 = 1 - sse / syy
+    intercept = y_mean - (coef * x_mean).sum(axis=1)
+
+    result = {'coef': coef, 'stderr': stderr, 't': t, 'p': p, 'partial_r': partial_r,
+              'intercept': intercept, 'r2': r2}
+    for key, value in result.items():
+        value = np.where(ok if value.ndim == 1 else ok[:, None], value, np.nan)
+        result[key] = value.T.reshape((k,) + tuple(grid)) if value.ndim == 2 else value.reshape(grid)
+    result['n'] = n.reshape(grid)
+    return result
+
+
+def regression_maps(target, predictors, min_df=1):
+    """target 为 DataArray，predictors 为 {名称: DataArray}，返回带 predictor 维的 Dataset"""
+    names = list(predictors)
+    arrays = [predictors[name].transpose(*target.dims) for name in names]
+    result = pixel_regression(target, arrays, min_df)
+    coords = {'predictor': names, 'lat': target['lat'], 'lon': target['lon']}
+    data_vars = {}
+    for key, value in result.items():
+        dims = ('predictor', 'lat', 'lon') if value.ndim == 3 else ('lat', 'lon')
+        data_vars[key] = (dims, value)
+    return xr.Dataset(data_vars, coords=coords)
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import xarray as xr
+
+# 流式逐格点统计：按年分块读取，用 Welford 算法累计均值和方差，
+# 用固定分箱直方图近似 P10/P50/P90 等分位数，同时得到年际标准差和变异系数。
+# 内存只与 格点数 × 分箱数 有关，输入从逐月换成逐日也不会增加
+
+QUANTILES = (0.1, 0.5, 0.9)
+
+
+def _blocks(data, dim):
+    # 每次取一个分块（如一年），其余非经纬度维展平为样本维：(样本, lat, lon)
+    for k in range(data.sizes[dim]):
+        block = data.isel({dim: k}).transpose(..., 'lat', 'lon').values.astype(np.float64)
+        yield block.reshape((-1,) + block.shape[-2:])
+
+
+def welford_init(shape):
+    return {'n': np.zeros(shape), 'mean': np.zeros(shape), 'm2': np.zeros(shape)}
+
+
+def welford_update(state, block):
+    """把 (样本, lat, lon) 分块合并进 Welford 累计量（Chan 等的分组合并公式）"""
+    valid = np.isfinite(block)
+    n_b = valid.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_b = np.where(valid, block, 0.0).sum(axis=0) / n_b
+        m2_b = np.where(valid, (block - mean_b) ** 2, 0.0).sum(axis=0)
+    has = n_b > 0
+    n = state['n'] + n_b
+    delta = np.where(has, mean_b - state['mean'], 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        state['mean'] = np.where(has, state['mean'] + delta * n_b / n, state['mean'])
+        state['m2'] = np.where(has, state['m2'] + m2_b + delta ** 2 * state['n'] * n_b / n, state['m2'])
+    state['n'] = n
+    return state
+
+
+def welford_result(state, ddof=1):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        var = state['m2'] / (state['n'] - ddof)
+    var[state['n'] <= ddof] = np.nan
+    mean = np.where(state['n'] > 0, state['mean'], np.nan)
+    return mean, np.sqrt(var)
+
+
+def histogram_update(counts, edges, block):
+    """把 (样本, lat, lon) 分块计入逐格点直方图 counts (bins, lat, lon)，超出范围的值计入首末分箱"""
+    n_bins = len(edges) - 1
+    n_pix = block.shape[-2] * block.shape[-1]
+    values = block.reshape(-1, n_pix)
+    valid = np.isfinite(values)
+    idx = np.clip(np.searchsorted(edges, values, side='right') - 1, 0, n_bins - 1)
+    flat = (idx * n_pix + np.arange(n_pix))[valid]
+    counts += np.bincount(flat, minlength=n_bins * n_pix).reshape(counts.shape).astype(counts.dtype)
+    return counts
+
+
+def histogram_quantiles(counts, edges, quantiles=QUANTILES):
+    """由逐格点直方图在分箱内线性插值得到分位数，返回 (quantile, lat, lon)"""
+    cum = np.cumsum(counts, axis=0, dtype=np.float64)
+    total = cum[-1]
+    result = np.full((len(quantiles),) + total.shape, np.nan)
+    for i, q in enumerate(quantiles):
+        target = q * total
+        # 第一个累计数达到 target 的分箱
+        k = np.minimum((cum < target).sum(axis=0), len(edges) - 2)
+        below = np.where(k > 0, np.take_along_axis(cum, np.maximum(k - 1, 0)[None], axis=0)[0], 0.0)
+        inside = np.take_along_axis(counts, k[None], axis=0)[0]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            frac = np.clip((target - below) / inside, 0, 1)
+        frac = np.where(inside > 0, frac, 0.0)
+        value = edges[k] + frac * (edges[k + 1] - edges[k])
+        result[i] = np.where(total > 0, value, np.nan)
+    return result
+
+
+def value_range(data, dim='year'):
+    """流式求全局最小、最大值，用作默认的直方图范围"""
+    vmin, vmax = np.inf, -np.inf
+    for block in _blocks(data, dim):
+        if np.isfinite(block).any():
+            vmin = min(vmin, np.nanmin(block))
+            vmax = max(vmax, np.nanmax(block))
+    return vmin, vmax
+
+
+def streaming_stats(data, dim='year', edges=None, bins=256, quantiles=QUANTILES):
+    """data 为 (year, ..., lat, lon)，按 dim 分块流式计算逐格点统计，返回 Dataset：
+
+    mean, std        : 全部时次的均值和标准差
+    interannual_std  : 逐年平均值的年际标准差
+    cv               : 年际变异系数 interannual_std / |年平均值的均值|
+    p10, p50, p90 …  : 由 bins 个固定分箱的直方图近似的分位数
+    edges 不给时先扫描一遍求取值范围。
+    """
+    if edges is None:
+        vmin, vmax = value_range(data, dim)
+        if vmax <= vmin:
+            vmax = vmin + 1.0
+        edges = np.linspace(vmin, vmax, bins + 1)
+    edges = np.asarray(edges, dtype=np.float64)
+
+    shape = (data.sizes['lat'], data.sizes['lon'])
+    state = welford_init(shape)
+    annual = welford_init(shape)
+    counts = np.zeros((len(edges) - 1,) + shape, dtype=np.uint32)
+    for block in _blocks(data, dim):
+        welford_update(state, block)
+        with np.errstate(invalid='ignore'):
+            valid = np.isfinite(block)
+            year_mean = np.where(valid, block, 0.0).sum(axis=0) / valid.sum(axis=0)
+        welford_update(annual, year_mean[None])
+        histogram_update(counts, edges, block)
+
+    mean, std = welford_result(state)
+    annual_mean, annual_std = welford_result(annual)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cv = annual_std / np.abs(annual_mean)
+    q = histogram_quantiles(counts, edges, quantiles)
+
+    dims = ('lat', 'lon')
+    ds = xr.Dataset({'mean': (dims, mean), 'std': (dims, std),
+                     'interannual_std': (dims, annual_std), 'cv': (dims, cv)},
+                    coords={'lat': data['lat'], 'lon': data['lon']})
+    for i, p in enumerate(quantiles):
+        ds[f'p{round(p * 100):g}'] = (dims, q[i])
+    ds.attrs['bin_width'] = float(np.max(np.diff(edges)))
+    return ds
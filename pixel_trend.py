@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import xarray as xr
+from scipy import stats
+from pv_loader import FILL_VALUE
+
+# 逐格点线性趋势：用沿年份轴的闭式求和一次性拟合所有格点的 OLS 斜率，
+# 同时给出标准误差、p 值，以及 Sen 斜率 / Mann-Kendall 检验
+
+
+def annual_series(data, fill_value=FILL_VALUE):
+    # (year, month, lat, lon) 先屏蔽填充值再对月份求平均，得到逐年序列
+    data = data.where(data != fill_value)
+    if 'month' in data.dims:
+        data = data.mean(dim='month')
+    return data.transpose('year', ...)
+
+
+def _prepare(y, x):
+    y = np.asarray(y, dtype=np.float64)
+    if x is None:
+        x = np.arange(y.shape[0], dtype=np.float64)
+    x = np.asarray(x, dtype=np.float64).reshape((-1,) + (1,) * (y.ndim - 1))
+    valid = np.isfinite(y)
+    return y, x, valid
+
+
+def linear_trend(y, x=None):
+    """y 为 (year, lat, lon)，返回逐格点的 slope、intercept、stderr、p、n"""
+    y, x, valid = _prepare(y, x)
+    n = valid.sum(axis=0)
+    n_safe = np.maximum(n, 1)
+
+    # 每个格点只用自己的有效年份，故 x 的均值也按格点计算
+    x_mean = np.where(valid, x, 0.0).sum(axis=0) / n_safe
+    y_mean = np.where(valid, y, 0.0).sum(axis=0) / n_safe
+    dx = np.where(valid, x - x_mean, 0.0)
+    dy = np.where(valid, y - y_mean, 0.0)
+    sxx = (dx * dx).sum(axis=0)
+    sxy = (dx * dy).sum(axis=0)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        slope = sxy / sxx
+        intercept = y_mean - slope * x_mean
+        resid = np.where(valid, dy - slope * dx, 0.0)
+        df = n - 2
+        sse = (resid * resid).sum(axis=0)
+        stderr = np.sqrt(sse / df / sxx)
+        t = slope / stderr
+        p = 2 * stats.t.sf(np.abs(t), df)
+
+    # 全为 NaN 或有效年份不足的格点不给结果（标准误差至少需要 3 年）
+    bad = (n < 2) | (sxx == 0)
+    slope[bad] = np.nan
+    intercept[bad] = np.nan
+    bad |= df < 1
+    stderr[bad] = np.nan
+    p[bad] = np.nan
+    return {'slope': slope, 'intercept': intercept, 'stderr': stderr, 'p': p, 'n': n}
+
+
+TREND_SUMS = ('n', 'st', 'sy', 'stt', 'sty', 'syy')
+
+
+def trend_sums(y, x):
+    """逐格点 OLS 的累加量（对年份轴求和），新增年份时直接相加即可更新"""
+    y, x, valid = _prepare(y, x)
+    x = np.where(valid, x, 0.0)
+    y = np.where(valid, y, 0.0)
+    return {'n': valid.sum(axis=0), 'st': x.sum(axis=0), 'sy': y.sum(axis=0),
+            'stt': (x * x).sum(axis=0), 'sty': (x * y).sum(axis=0), 'syy': (y * y).sum(axis=0)}
+
+
+def trend_from_sums(sums):
+    """由累加量得到与 linear_trend 相同的 slope、intercept、stderr、p、n"""
+    n = np.asarray(sums['n'])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sxx = sums['stt'] - sums['st'] ** 2 / n
+        sxy = sums['sty'] - sums['st'] * sums['sy'] / n
+        syy = sums['syy'] - sums['sy'] ** 2 / n
+        slope = sxy / sxx
+        intercept = (sums['sy'] - slope * sums['st']) / n
+        df = n - 2
+        sse = np.maximum(syy - slope * sxy, 0.0)
+        stderr = np.sqrt(sse / df / sxx)
+        p = 2 * stats.t.sf(np.abs(slope / stderr), df)
+
+    bad = (n < 2) | ~(sxx > 0)
+    slope[bad] = np.nan
+    intercept[bad] = np.nan
+    bad |= df < 1
+    stderr[bad] = np.nan
+    p[bad] = np.nan
+    return {'slope': slope, 'intercept': intercept, 'stderr': stderr, 'p': p, 'n': n}
+
+
+def _pairs(n_time):
+    i, j = np.triu_indices(n_time, k=1)
+    return i, j
+
+
+def sens_slope(y, x=None):
+    """逐格点 Sen 斜率（所有年份对斜率的中位数）"""
+    y, x, valid = _prepare(y, x)
+    i, j = _pairs(y.shape[0])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        pair_slopes = (y[j] - y[i]) / (x[j] - x[i])
+    # 含 NaN 的年份对在 nanmedian 中自动剔除，全 NaN 格点返回 NaN
+    finite_any = np.isfinite(pair_slopes).any(axis=0)
+    pair_slopes[:, ~finite_any] = 0.0
+    slope = np.nanmedian(pair_slopes, axis=0)
+    slope[~finite_any] = np.nan
+    return slope
+
+
+def mann_kendall(y):
+    """逐格点 Mann-Kendall 检验，返回 S、Z、p（未做结值方差修正）"""
+    y = np.asarray(y, dtype=np.float64)
+    valid = np.isfinite(y)
+    n = valid.sum(axis=0)
+    i, j = _pairs(y.shape[0])
+
+    # 只统计两端都有效的年份对
+    both = valid[i] & valid[j]
+    s = np.where(both, np.sign(y[j] - y[i]), 0.0).sum(axis=0)
+    var_s = n * (n - 1) * (2 * n + 5) / 18.0
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        z = np.where(s > 0, (s - 1) / np.sqrt(var_s),
+                     np.where(s < 0, (s + 1) / np.sqrt(var_s), 0.0))
+        p = 2 * stats.norm.sf(np.abs(z))
+
+    bad = n < 3
+    z[bad] = np.nan
+    p[bad] = np.nan
+    return {'s': s, 'z': z, 'p': p, 'n': n}
+
+
+def trend_map(data, method='ols', fill_value=FILL_VALUE):
+    """对 (year, month, lat, lon) 或 (year, lat, lon) 的 DataArray 计算趋势图
+
+    method='ols' 返回 slope/intercept/stderr/p；method='sen' 返回 Sen 斜率
+    和 Mann-Kendall 的 z/p。斜率单位为每年。
+    """
+    series = annual_series(data, fill_value)
+    years = series['year'].values
+    x = years - years[0]
+    values = series.values
+    dims = series.dims[1:]
+    coords = {d: series[d] for d in dims}
+
+    if method == 'ols':
+        result = linear_trend(values, x)
+        fields = {k: result[k] for k in ('slope', 'intercept', 'stderr', 'p', 'n')}
+    elif method == 'sen':
+        mk = mann_kendall(values)
+        fields = {'slope': sens_slope(values, x), 'z': mk['z'], 'p': mk['p'], 'n': mk['n']}
+    else:
+        raise ValueError(f'未知的趋势方法: {method}')
+
+    return xr.Dataset({k: (dims, v) for k, v in fields.items()}, coords=coords)
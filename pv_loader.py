@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import json
+import numpy as np
+import xarray as xr
+
+# PV_2007_2016.nc 的统一读取入口：按年分块惰性读取，在变量层面一次性把
+# -9999 填充值换成 NaN，并把解码后的 float32 数据缓存为 .npy 内存映射文件，
+# 之后的运行直接映射缓存，不再解码 NetCDF
+
+try:
+    import dask  # noqa: F401
+    _CHUNKS = {'year': 1}
+except ImportError:
+    _CHUNKS = None
+
+FILE_PATH = r'C:\Users\Chen Yong\Desktop\InnovationProgram\PV_2007_2016.nc'
+FILL_VALUE = -9999.0
+VARIABLES = ('AOD', 'PV', 'DSW', 'Tas', 'Wind')
+
+
+def mask_fill(da, fill_value=FILL_VALUE):
+    # 屏蔽填充值并统一为 float32
+    return da.where(da != fill_value).astype(np.float32)
+
+
+def default_cache_dir(path=FILE_PATH):
+    root, _ = os.path.splitext(path)
+    return root + '_cache'
+
+
+def source_stamp(path):
+    st = os.stat(path)
+    return {'source': os.path.abspath(path), 'size': st.st_size, 'mtime': st.st_mtime}
+
+
+def write_atomic(path, write):
+    """先写同目录下的临时文件再 os.replace 到 path，write(f) 向打开的二进制文件写入内容
+
+    多个进程同时建同一个缓存时，读取方只会看到完整的旧文件或新文件。
+    """
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'wb') as f:
+        write(f)
+    os.replace(tmp, path)
+
+
+def _read_meta(cache_dir):
+    meta_path = os.path.join(cache_dir, 'meta.json')
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _cache_is_valid(meta, path, variables):
+    if meta is None:
+        return False
+    if os.path.exists(path) and meta.get('stamp') != source_stamp(path):
+        return False
+    return all(v in meta['variables'] for v in variables)
+
+
+def open_netcdf(path=FILE_PATH, variables=VARIABLES, chunks=_CHUNKS):
+    """直接读取 NetCDF（有 dask 时按年分块），返回已屏蔽填充值的 Dataset"""
+    data = xr.open_dataset(path, chunks=chunks, mask_and_scale=True)
+    masked = xr.Dataset({v: mask_fill(data[v]) for v in variables})
+    return masked.assign_attrs(data.attrs)
+
+
+def build_cache(path=FILE_PATH, variables=VARIABLES, cache_dir=None):
+    """把解码后的变量逐年写入 .npy 内存映射文件，内存占用只有一年的数据"""
+    cache_dir = cache_dir or default_cache_dir(path)
+    os.makedirs(cache_dir, exist_ok=True)
+    data = xr.open_dataset(path, chunks=_CHUNKS, mask_and_scale=True)
+
+    meta = {'stamp': source_stamp(path), 'variables': {}}
+    coords = {}
+    for name in variables:
+        da = data[name]
+        for d in da.dims:
+            coords[d] = data[d].values
+        out = np.lib.format.open_memmap(os.path.join(cache_dir, name + '.npy'), mode='w+',
+                                        dtype=np.float32, shape=da.shape)
+        # 按第一个维度（年）逐块解码写入
+        for k in range(da.shape[0]):
+            out[k] = mask_fill(da[k]).values
+        out.flush()
+        del out
+        meta['variables'][name] = list(da.dims)
+
+    np.savez(os.path.join(cache_dir, 'coords.npz'), **coords)
+    with open(os.path.join(cache_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=1)
+    data.close()
+    return cache_dir
+
+
+def _open_cache(cache_dir, variables, meta):
+    coords = dict(np.load(os.path.join(cache_dir, 'coords.npz')))
+    data_vars = {}
+    for name in variables:
+        dims = meta['variables'][name]
+        values = np.load(os.path.join(cache_dir, name + '.npy'), mmap_mode='r')
+        data_vars[name] = xr.DataArray(values, dims=dims, coords={d: coords[d] for d in dims})
+    return xr.Dataset(data_vars)
+
+
+def open_cube(path=FILE_PATH, variables=VARIABLES, cache_dir=None, use_cache=True):
+    """返回已屏蔽填充值的 float32 Dataset
+
+    use_cache=True 时优先映射本地 .npy 缓存；缓存不存在或源文件已更新时先重建缓存。
+    """
+    variables = tuple(variables)
+    if not use_cache:
+        return open_netcdf(path, variables)
+
+    cache_dir = cache_dir or default_cache_dir(path)
+    meta = _read_meta(cache_dir)
+    if not _cache_is_valid(meta, path, variables):
+        build_cache(path, tuple(dict.fromkeys(VARIABLES + variables)), cache_dir)
+        meta = _read_meta(cache_dir)
+    return _open_cache(cache_dir, variables, meta)
+
+
+def load_variable(name, path=FILE_PATH, **kwargs):
+    """读取单个已屏蔽填充值的变量"""
+    return open_cube(path, variables=(name,), **kwargs)[name]
+
+
+def _append_npy(npy_path, block):
+    # year 是 C 顺序数组的第一维，追加年份只需改写文件头中的形状并在文件末尾写入数据
+    # block 转换为文件中已有的数据类型
+    with open(npy_path, 'r+b') as f:
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+        header_len = f.tell()
+        block = np.ascontiguousarray(block, dtype=dtype)
+        if fortran or tuple(shape[1:]) != block.shape[1:]:
+            raise ValueError(f'{npy_path} 与追加数据的形状不一致')
+
+        new_shape = (shape[0] + block.shape[0],) + tuple(shape[1:])
+        header = {'descr': np.lib.format.dtype_to_descr(dtype), 'fortran_order': False, 'shape': new_shape}
+        buf = io.BytesIO()
+        np.lib.format.write_array_header_2_0(buf, header) if version == (2, 0) \
+            else np.lib.format.write_array_header_1_0(buf, header)
+
+        if len(buf.getvalue()) == header_len:
+            f.seek(0)
+            f.write(buf.getvalue())
+            f.seek(0, os.SEEK_END)
+            f.write(block.tobytes())
+            return new_shape
+
+    # 文件头长度变化时（极少见）只能整体重写
+    old = np.load(npy_path)
+    np.save(npy_path, np.concatenate([old, block]))
+    return new_shape
+
+
+def append_years(new_data, path=FILE_PATH, cache_dir=None):
+    """把新年份（如 2023 年）的数据追加到 .npy 缓存，只读取、解码新年份
+
+    new_data 为只含新年份的 Dataset（未屏蔽填充值也可），返回追加的年份数组。
+    """
+    cache_dir = cache_dir or default_cache_dir(path)
+    meta = _read_meta(cache_dir)
+    if meta is None:
+        raise FileNotFoundError(f'缓存 {cache_dir} 不存在，请先运行 build_cache')
+    coords = dict(np.load(os.path.join(cache_dir, 'coords.npz')))
+    new_years = np.asarray(new_data['year'].values)
+    if np.any(new_years <= coords['year'].max()):
+        raise ValueError(f'年份 {new_years} 已在缓存中')
+
+    for name, dims in meta['variables'].items():
+        block = mask_fill(new_data[name].transpose(*dims)).values
+        _append_npy(os.path.join(cache_dir, name + '.npy'), block)
+
+    coords['year'] = np.concatenate([coords['year'], new_years])
+    np.savez(os.path.join(cache_dir, 'coords.npz'), **coords)
+    if os.path.exists(path):
+        meta['stamp'] = source_stamp(path)
+    with open(os.path.join(cache_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=1)
+    return new_years
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import xarray as xr
+
+# 光伏发电潜力 PVpot 的融合计算：
+#   Tcell = c1 + c2*T + c3*I - c4*WS
+#   PR    = 1 - Y*(Tcell - Tstc)
+#   PVpot = PR * I / Istc
+# 展开后 PVpot = I/Istc * (a + b*T + c*I + d*WS)，对系数是线性的，
+# 因此多组系数可以写成一次矩阵乘法，逐年分块计算，不生成 Tcell、PR 等中间数据块
+
+ISTC = 1000  # 标准测试条件下的短波辐射 W/m^2
+TSTC = 25    # 标准测试条件下的温度，单位：℃
+GAMMA = 0.005  # 性能比温度系数，单晶硅太阳能电池
+
+COEFF_SETS = {
+    'A': (2.56, 0.47, 0.065, 1.02),  # TrendOfPVpotAndAOD.py、vision*.py 使用
+    'B': (2, 0.95, 0.05, 1.5),       # PVpotAcrossChina.py 使用
+}
+
+
+def linear_weights(coeffs, gamma=GAMMA, tstc=TSTC):
+    """把 (c1, c2, c3, c4) 换成 [a, b, c, d]，满足 PR = a + b*T + c*I + d*WS"""
+    coeffs = np.atleast_2d(np.asarray(coeffs, dtype=np.float64))
+    c1, c2, c3, c4 = coeffs.T
+    return np.stack([1 - gamma * (c1 - tstc), -gamma * c2, -gamma * c3, gamma * c4], axis=1)
+
+
+def pvpot_block(I, T, WS, coeffs=COEFF_SETS['A'], gamma=GAMMA, tstc=TSTC, istc=ISTC, out=None):
+    """对单组系数原地计算 PVpot，只使用一个输出缓冲区"""
+    a, b, c, d = linear_weights(coeffs, gamma, tstc)[0]
+    if out is None:
+        out = np.empty(np.shape(I), dtype=np.float32)
+    np.multiply(T, b, out=out)
+    out += a
+    out += c * I
+    out += d * WS
+    out *= I
+    out /= istc
+    return out
+
+
+def pvpot_sweep_block(I, T, WS, coeff_sets, gamma=GAMMA, tstc=TSTC, istc=ISTC):
+    """对多组系数一次计算 PVpot，返回 (coeff_set, ...) 数组"""
+    W = linear_weights(coeff_sets, gamma, tstc).astype(np.float32)
+    shape = np.shape(I)
+    features = np.stack([np.ones(shape, dtype=np.float32), T, I, WS]).reshape(4, -1)
+    out = W @ features
+    out *= np.ravel(I) / istc
+    return out.reshape((len(W),) + shape)
+
+
+def compute_pvpot(I, T, WS, coeffs=COEFF_SETS['A'], gamma=GAMMA, tstc=TSTC, istc=ISTC):
+    """由 DSW、Tas、Wind 计算 PVpot
+
+    coeffs 为一组 (c1, c2, c3, c4) 时返回与输入同维的 DataArray；
+    为多组系数（列表或 dict）时返回带 coeff_set 维的 DataArray。
+    """
+    I, T, WS = xr.broadcast(I, T, WS)
+    T = T.transpose(*I.dims)
+    WS = WS.transpose(*I.dims)
+
+    names = None
+    if isinstance(coeffs, dict):
+        names = list(coeffs)
+        coeffs = list(coeffs.values())
+    sweep = np.ndim(coeffs) == 2
+
+    # 有年份维时逐年计算，输出数组只分配一次
+    shape = I.shape
+    if sweep:
+        result = np.empty((len(coeffs),) + shape, dtype=np.float32)
+    else:
+        result = np.empty(shape, dtype=np.float32)
+
+    if 'year' in I.dims:
+        axis = I.dims.index('year')
+        blocks = [((slice(None),) * axis + (k,), {'year': k}) for k in range(shape[axis])]
+    else:
+        blocks = [((), {})]
+    for index, sel in blocks:
+        i_blk = I.isel(sel).values.astype(np.float32, copy=False)
+        t_blk = T.isel(sel).values.astype(np.float32, copy=False)
+        w_blk = WS.isel(sel).values.astype(np.float32, copy=False)
+        if sweep:
+            result[(slice(None),) + index] = pvpot_sweep_block(i_blk, t_blk, w_blk, coeffs, gamma, tstc, istc)
+        else:
+            pvpot_block(i_blk, t_blk, w_blk, coeffs, gamma, tstc, istc, out=result[index])
+
+    coords = {d: I[d] for d in I.dims if d in I.coords}
+    if sweep:
+        labels = names if names is not None else np.arange(len(coeffs))
+        coords['coeff_set'] = labels
+        return xr.DataArray(result, dims=('coeff_set',) + I.dims, coords=coords, name='PVpot')
+    return xr.DataArray(result, dims=I.dims, coords=coords, name='PVpot')
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+import warnings
+import numpy as np
+import xarray as xr
+from pvpot import COEFF_SETS, GAMMA, TSTC, ISTC, linear_weights, pvpot_block
+from pixel_trend import linear_trend
+
+# PVpot 变化归因：PVpot = I/Istc * (a + b*T + c*I + d*WS) 有解析偏导数
+#   ∂P/∂I  = (a + b*T + 2c*I + d*WS) / Istc
+#   ∂P/∂T  = b*I / Istc
+#   ∂P/∂WS = d*I / Istc
+# 在逐月气候态处求偏导，乘以各变量相对气候态的距平，得到每年每个格点
+# DSW、Tas、Wind 各自贡献的 PVpot 距平，一阶展开的余项记为 nonlinear。
+# 只需扫描两遍数据，不必把某个变量固定为气候态再重算三遍
+
+DRIVERS = ('DSW', 'Tas', 'Wind')
+
+
+def pvpot_derivatives(I, T, WS, coeffs=COEFF_SETS['A'], gamma=GAMMA, tstc=TSTC, istc=ISTC):
+    """返回 (∂P/∂I, ∂P/∂T, ∂P/∂WS)，与输入同形状"""
+    a, b, c, d = linear_weights(coeffs, gamma, tstc)[0]
+    dI = (a + b * T + 2 * c * I + d * WS) / istc
+    dT = b * I / istc
+    dW = d * I / istc
+    return dI, dT, dW
+
+
+def _year_blocks(I, T, WS):
+    for k in range(I.sizes['year']):
+        yield k, [x.isel(year=k).values.astype(np.float64) for x in (I, T, WS)]
+
+
+def attribute_pvpot(I, T, WS, coeffs=COEFF_SETS['A'], gamma=GAMMA, tstc=TSTC, istc=ISTC):
+    """I、T、WS 为 (year, month, lat, lon)，返回 PVpot 距平的逐年归因 Dataset
+
+    contribution : (driver, year, lat, lon)，driver 为 DSW、Tas、Wind、nonlinear，
+                   四项之和等于 anomaly
+    anomaly      : (year, lat, lon)，PVpot 年均值相对多年平均的距平
+    trend        : (driver, lat, lon)，各项贡献的线性趋势（每年）
+    trend_total  : (lat, lon)，PVpot 本身的线性趋势
+    """
+    I, T, WS = [x.transpose('year', 'month', 'lat', 'lon') for x in xr.broadcast(I, T, WS)]
+    shape = I.shape[1:]
+
+    # 第一遍：逐月气候态和 PVpot 的逐月多年平均
+    sums = np.zeros((4,) + shape)
+    counts = np.zeros((4,) + shape)
+    for _, block in _year_blocks(I, T, WS):
+        P = pvpot_block(*block, coeffs, gamma, tstc, istc, out=np.empty(shape))
+        for i, x in enumerate(block + [P]):
+            valid = np.isfinite(x)
+            sums[i] += np.where(valid, x, 0.0)
+            counts[i] += valid
+    with np.errstate(invalid='ignore', divide='ignore'):
+        clim = sums / counts
+    derivs = pvpot_derivatives(*clim[:3], coeffs, gamma, tstc, istc)
+
+    # 第二遍：偏导数 × 距平，再对月份求平均
+    n_year = I.sizes['year']
+    contribution = np.empty((len(DRIVERS) + 1, n_year) + shape[1:])
+    anomaly = np.empty((n_year,) + shape[1:])
+    with np.errstate(invalid='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # 全缺测格点的 nanmean
+        for k, block in _year_blocks(I, T, WS):
+            P = pvpot_block(*block, coeffs, gamma, tstc, istc, out=np.empty(shape))
+            linear = np.stack([d * (x - c) for d, x, c in zip(derivs, block, clim)])
+            dP = P - clim[3]
+            # 只保留 PVpot 有效的时次，使四项贡献之和严格等于距平
+            linear[:, ~np.isfinite(dP)] = np.nan
+            contribution[:len(DRIVERS), k] = np.nanmean(linear, axis=1)
+            contribution[-1, k] = np.nanmean(dP - linear.sum(axis=0), axis=0)
+            anomaly[k] = np.nanmean(dP, axis=0)
+
+    x = I['year'].values - I['year'].values[0]
+    trend = np.stack([linear_trend(c, x)['slope'] for c in contribution])
+    trend_total = linear_trend(anomaly, x)['slope']
+
+    drivers = list(DRIVERS) + ['nonlinear']
+    coords = {'driver': drivers, 'year': I['year'], 'lat': I['lat'], 'lon': I['lon']}
+    return xr.Dataset({'contribution': (('driver', 'year', 'lat', 'lon'), contribution),
+                       'anomaly': (('year', 'lat', 'lon'), anomaly),
+                       'trend': (('driver', 'lat', 'lon'), trend),
+                       'trend_total': (('lat', 'lon'), trend_total)}, coords=coords)
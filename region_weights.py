@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+import os
+import numpy as np
+import xarray as xr
+from scipy import sparse
+
+# 区域加权平均：一次性构建稀疏的 (区域 × 格点) 权重矩阵，权重为 cos(纬度) 面积权重，
+# 可再乘上多边形掩膜或覆盖比例。之后所有区域的时间序列只需一次矩阵乘法
+
+# 各地区的经纬度范围 [(lat_min, lat_max), (lon_min, lon_max)]
+CHINA_REGIONS = {
+    "North China": [(34, 42), (114, 120)],
+    "Northeast China": [(42, 54), (122, 135)],
+    "East China": [(25, 34), (118, 123)],
+    "Central China": [(28, 34), (108, 118)],
+    "South China": [(20, 28), (110, 117)],
+    "Southwest China": [(22, 34), (98, 108)],
+    "Northwest China": [(34, 42), (85, 110)],
+}
+
+
+def area_weights(lat, lon):
+    # 规则经纬度网格上格点面积正比于 cos(纬度)
+    w = np.cos(np.deg2rad(np.asarray(lat, dtype=np.float64)))
+    return np.broadcast_to(w[:, None], (len(lat), len(lon)))
+
+
+def polygon_mask(lat, lon, geometry):
+    # 格点中心落在多边形内为 True
+    import shapely
+    lon2d, lat2d = np.meshgrid(lon, lat)
+    return shapely.contains_xy(geometry, lon2d, lat2d)
+
+
+def region_weight_matrix(lat, lon, regions=CHINA_REGIONS, masks=None, polygons=None, weighted=True):
+    """构建 (区域 × 格点) 稀疏权重矩阵，每行权重之和为 1
+
+    regions 为 {名称: [(lat_min, lat_max), (lon_min, lon_max)]}；
+    masks 为 {名称: (lat, lon) 布尔掩膜或覆盖比例}，polygons 为 {名称: shapely 几何}，
+    两者都是可选的裁剪条件，与经纬度框相乘。
+    """
+    lat = np.asarray(lat)
+    lon = np.asarray(lon)
+    base = area_weights(lat, lon) if weighted else np.ones((len(lat), len(lon)))
+    names = list(regions)
+
+    rows, cols, vals = [], [], []
+    for k, name in enumerate(names):
+        (lat_min, lat_max), (lon_min, lon_max) = regions[name]
+        inside = ((lat >= lat_min) & (lat <= lat_max))[:, None] & ((lon >= lon_min) & (lon <= lon_max))[None, :]
+        w = np.where(inside, base, 0.0)
+        if masks is not None and name in masks:
+            w = w * np.asarray(masks[name], dtype=np.float64)
+        if polygons is not None and name in polygons:
+            w = w * polygon_mask(lat, lon, polygons[name])
+        idx = np.flatnonzero(w)
+        if idx.size == 0:
+            continue
+        rows.append(np.full(idx.size, k))
+        cols.append(idx)
+        vals.append(w.ravel()[idx] / w.ravel()[idx].sum())
+
+    rows = np.concatenate(rows) if rows else np.zeros(0, dtype=int)
+    cols = np.concatenate(cols) if cols else np.zeros(0, dtype=int)
+    vals = np.concatenate(vals) if vals else np.zeros(0)
+    matrix = sparse.csr_matrix((vals, (rows, cols)), shape=(len(names), lat.size * lon.size))
+    return matrix, names
+
+
+def load_region_weights(cache_file, lat, lon, regions=CHINA_REGIONS, **kwargs):
+    """从 .npz 读取权重矩阵，不存在或网格不一致时重建并保存"""
+    names = list(regions)
+    if os.path.exists(cache_file):
+        matrix = sparse.load_npz(cache_file)
+        meta_file = cache_file + '.names.npy'
+        if matrix.shape == (len(names), len(lat) * len(lon)) and os.path.exists(meta_file):
+            if list(np.load(meta_file)) == names:
+                return matrix, names
+    matrix, names = region_weight_matrix(lat, lon, regions, **kwargs)
+    sparse.save_npz(cache_file, matrix)
+    np.save(cache_file + '.names.npy', np.asarray(names))
+    return matrix, names
+
+
+def regional_mean(data, matrix, names):
+    """所有区域的加权平均时间序列，返回 (region, 其余维度) 的 DataArray
+
+    缺测格点在每个时次按剩余格点的权重重新归一化，与 .mean(skipna=True) 一致。
+    """
+    data = data.transpose(..., 'lat', 'lon')
+    lead_dims = data.dims[:-2]
+    values = data.values.reshape(-1, data.sizes['lat'] * data.sizes['lon']).T
+    valid = np.isfinite(values)
+
+    # 两次稀疏矩阵乘法：加权和与有效权重和
+    total = matrix @ np.where(valid, values, 0.0)
+    norm = matrix @ valid.astype(np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(norm > 0, total / norm, np.nan)
+
+    shape = (len(names),) + tuple(data.sizes[d] for d in lead_dims)
+    coords = {d: data[d] for d in lead_dims if d in data.coords}
+    coords['region'] = names
+    return xr.DataArray(mean.reshape(shape), dims=('region',) + lead_dims, coords=coords)
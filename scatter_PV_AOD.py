@@ -5,20 +5,16 @@ Created on Tue Sep 17 00:14:56 2024
 @author: Lenovo
 """
 
-import xarray as xr
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.stats import pearsonr
+from pv_loader import open_cube
+from suff_stats import subset_regression
 
 # 定义文件路径
 file_path = r'C:\Users\Chen Yong\Desktop\InnovationProgram\PV_2007_2016.nc'
 
-# 加载数据
-data = xr.open_dataset(file_path)
-
-# 提取AOD和PV数据
-aod = data['AOD']
-pv = data['PV']
+# 加载数据（已屏蔽填充值的内存映射数据块）
+data = open_cube(file_path, variables=['AOD', 'PV'])
 
 # 选择华北地区的经纬度范围
 # 假设华北的定义为经度110°E到120°E，纬度32°N到42°N
@@ -28,13 +24,9 @@ lat_range = slice(32, 42)
 # 选择6-8月的数据
 months = [6,7,8]
 
-# 选择指定年份、月份和地区的AOD和PV数据
-selected_aod = aod.sel(year=slice(2007, 2022), month=months, lon=lon_range, lat=lat_range)
-selected_pv = pv.sel(year=slice(2007, 2022), month=months, lon=lon_range, lat=lat_range)
-
-# 将填充值设置为NaN
-selected_aod = xr.where(selected_aod != -9999.0, selected_aod, np.nan)
-selected_pv = xr.where(selected_pv != -9999.0, selected_pv, np.nan)
+# 选择指定年份、月份和地区的AOD和PV数据（内存映射，只读取这一切片）
+selected_aod = data['AOD'].sel(year=slice(2007, 2022), month=months, lon=lon_range, lat=lat_range)
+selected_pv = data['PV'].sel(year=slice(2007, 2022), month=months, lon=lon_range, lat=lat_range)
 
 # 将数据转换为数组
 aod_data = selected_aod.values.flatten()
@@ -45,8 +37,10 @@ valid_indices = ~np.isnan(aod_data) & ~np.isnan(pv_data)
 aod_data = aod_data[valid_indices]
 pv_data = pv_data[valid_indices]
 
-# 计算相关系数和显著性p值
-corr, p_value = pearsonr(aod_data, pv_data)
+# 由缓存的充分统计量计算相关系数、显著性p值和线性回归系数（区域内格点合并为一个样本）
+fit = subset_regression('AOD', 'PV', years=slice(2007, 2022), months=months,
+                        region=(32, 42, 110, 120), pooled=True, path=file_path)
+corr, p_value = float(fit['r']), float(fit['p'])
 
 # 绘制散点图
 plt.figure(figsize=(10, 6))
@@ -59,7 +53,7 @@ plt.ylabel('PV$_{POT}$', fontsize=18)  # 设置y轴标签字体大小
 plt.xticks(fontsize=15)
 plt.yticks(fontsize=15)
 # 计算线性回归线
-slope, intercept = np.polyfit(aod_data, pv_data, 1)
+slope, intercept = float(fit['slope']), float(fit['intercept'])
 line = slope * aod_data + intercept
 plt.plot(aod_data, line, color='red', label=f'Linear fit: y={slope:.2f}x+{intercept:.2f}')
 
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+from pv_loader import FILE_PATH
+from climatology import load_climatology
+from incremental import load_trend
+from wind_resource import hub_height_speed, power_density
+from china_mask import get_province_masks
+
+# 候选站址排序：由缓存的 PV 年平均、PV 趋势、轮毂高度风功率密度和 AOD 年平均
+# 对每个格点按用户权重打分（各指标先在有效格点上标准化），
+# 每个省用 np.argpartition 取前 k 个格点，只对这 k 个排序，不做全量排序
+
+DEFAULT_WEIGHTS = {'pv_mean': 1.0, 'pv_trend': 0.5, 'wind_power_density': 1.0, 'aod': -0.5}
+
+
+def site_fields(years=(2007, 2022), data=None, path=FILE_PATH, cache_dir=None):
+    """读取（必要时建立）打分所用的缓存指标，返回 (lat, lon) 的 Dataset"""
+    pv = load_climatology('PV', years, None, data, path, cache_dir)
+    aod = load_climatology('AOD', years, None, data, path, cache_dir)
+    wind = load_climatology('Wind', years, None, data, path, cache_dir)
+    trend = load_trend('PV', years, None, data, path)
+
+    # 风功率密度对逐月气候态分别计算后再平均，保留季节差异
+    cycle = wind['sum'] / wind['count'].where(wind['count'] > 0)
+    wpd = power_density(hub_height_speed(cycle)).mean(dim='month')
+    return xr.Dataset({'pv_mean': pv['year'], 'pv_trend': trend['slope'],
+                       'wind_power_density': wpd, 'aod': aod['year']})
+
+
+def score_sites(fields, weights=DEFAULT_WEIGHTS):
+    """各指标标准化（z 分数）后按权重求和，任一参与指标缺测的格点为 NaN"""
+    score = 0.0
+    for name, w in weights.items():
+        values = np.asarray(fields[name], dtype=np.float64)
+        mean = np.nanmean(values)
+        std = np.nanstd(values)
+        score = score + w * (values - mean) / (std if std > 0 else 1.0)
+    return score
+
+
+def top_k_sites(fields, k=10, weights=DEFAULT_WEIGHTS, masks=None, shapefile=None):
+    """返回每个省得分最高的 k 个格点的 DataFrame
+
+    masks 为 {省名: (lat, lon) 布尔数组}，不给时由 china_mask 读取缓存的省级掩膜。
+    列为 province、rank、lat、lon、score 以及 weights 中的各项指标。
+    """
+    lat = fields['lat'].values
+    lon = fields['lon'].values
+    if masks is None:
+        masks = get_province_masks(lon, lat, shapefile=shapefile)
+    score = score_sites(fields, weights)
+    flat_score = score.ravel()
+    values = {name: np.asarray(fields[name]).ravel() for name in weights}
+
+    rows = []
+    for province, mask in masks.items():
+        idx = np.flatnonzero(np.asarray(mask).ravel() & np.isfinite(flat_score))
+        if idx.size == 0:
+            continue
+        if idx.size > k:
+            idx = idx[np.argpartition(-flat_score[idx], k - 1)[:k]]
+        idx = idx[np.argsort(-flat_score[idx])]
+        i, j = np.unravel_index(idx, score.shape)
+        table = {'province': province, 'rank': np.arange(1, idx.size + 1),
+                 'lat': lat[i], 'lon': lon[j], 'score': flat_score[idx]}
+        table.update({name: v[idx] for name, v in values.items()})
+        rows.append(pd.DataFrame(table))
+
+    if not rows:
+        return pd.DataFrame(columns=['province', 'rank', 'lat', 'lon', 'score'] + list(weights))
+    return pd.concat(rows, ignore_index=True)
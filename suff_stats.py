@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import numpy as np
+import xarray as xr
+from scipy import stats
+from pv_loader import FILE_PATH, open_cube, default_cache_dir, _append_npy
+from climatology import select_region, _current_stamp
+
+# 充分统计量存储：对每个变量对，逐格点、逐 (year, month) 保存
+# n、Σx、Σy、Σx²、Σy²、Σxy。任意季节、年份段、区域的相关系数和回归系数
+# 都由这些量的求和得到，不再读取原始数据块。
+# 每个变量对一个目录，每个统计量一个 .npy 文件（n 为 uint8，其余为 float32），
+# 以内存映射方式打开，求和时只读取选中的切片，并在 float64 中累加
+
+STATS = ('n', 'sx', 'sy', 'sxx', 'syy', 'sxy')
+STAT_DTYPES = {'n': np.uint8, 'sx': np.float32, 'sy': np.float32,
+               'sxx': np.float32, 'syy': np.float32, 'sxy': np.float32}
+DIMS = ('year', 'month', 'lat', 'lon')
+DEFAULT_PAIRS = (('AOD', 'PV'),)
+
+
+def pair_stats(x, y):
+    """由 (..., lat, lon) 的 x、y 计算同时有效时的充分统计量"""
+    valid = np.isfinite(x) & np.isfinite(y)
+    x = np.where(valid, x, 0.0).astype(np.float64)
+    y = np.where(valid, y, 0.0).astype(np.float64)
+    return {'n': valid.astype(np.uint8), 'sx': x, 'sy': y,
+            'sxx': x * x, 'syy': y * y, 'sxy': x * y}
+
+
+def _store_dir(path, cache_dir):
+    return cache_dir or os.path.join(default_cache_dir(path), 'suff_stats')
+
+
+def _store_path(cache_dir, pair):
+    return os.path.join(cache_dir, f'{pair[0]}_{pair[1]}')
+
+
+def _write_meta(store_path, attrs):
+    # meta.json 最后写入，没有 meta.json 的目录视为未建成
+    with open(os.path.join(store_path, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump({'x': attrs['x'], 'y': attrs['y'], 'stamp': attrs['stamp']}, f)
+
+
+def read_store(store_path):
+    """以内存映射方式打开变量对的充分统计量，返回 (year, month, lat, lon) 的 Dataset"""
+    with open(os.path.join(store_path, 'meta.json'), 'r', encoding='utf-8') as f:
+        attrs = json.load(f)
+    with np.load(os.path.join(store_path, 'coords.npz')) as f:
+        coords = {d: f[d] for d in DIMS}
+    data_vars = {s: (DIMS, np.load(os.path.join(store_path, s + '.npy'), mmap_mode='r')) for s in STATS}
+    return xr.Dataset(data_vars, coords=coords, attrs=attrs)
+
+
+def build_store(pairs=DEFAULT_PAIRS, data=None, path=FILE_PATH, cache_dir=None):
+    """逐年扫描一次数据，为所有变量对建立充分统计量并写入缓存
+
+    统计量逐年直接写入内存映射的 .npy 文件，不在内存中保存整个数组。
+    """
+    pairs = [tuple(p) for p in pairs]
+    cache_dir = _store_dir(path, cache_dir)
+    if data is None:
+        data = open_cube(path)
+
+    sample = data[pairs[0][0]].transpose(*DIMS)
+    arrays = {}
+    for p in pairs:
+        store_path = _store_path(cache_dir, p)
+        os.makedirs(store_path, exist_ok=True)
+        if os.path.exists(os.path.join(store_path, 'meta.json')):
+            os.remove(os.path.join(store_path, 'meta.json'))
+        arrays[p] = {s: np.lib.format.open_memmap(os.path.join(store_path, s + '.npy'), mode='w+',
+                                                  dtype=STAT_DTYPES[s], shape=sample.shape)
+                     for s in STATS}
+
+    # 外层按年循环，同一年的变量只读取一次
+    for k, year in enumerate(sample['year'].values):
+        block = {}
+        for v in {v for p in pairs for v in p}:
+            block[v] = data[v].sel(year=year).transpose('month', 'lat', 'lon').values
+        for p in pairs:
+            for s, value in pair_stats(block[p[0]], block[p[1]]).items():
+                arrays[p][s][k] = value
+
+    stamp = _current_stamp(path)
+    result = {}
+    for p in pairs:
+        store_path = _store_path(cache_dir, p)
+        for s in STATS:
+            arrays[p][s].flush()
+        del arrays[p]
+        np.savez(os.path.join(store_path, 'coords.npz'), **{d: sample[d].values for d in DIMS})
+        _write_meta(store_path, {'x': p[0], 'y': p[1], 'stamp': stamp})
+        result[p] = read_store(store_path)
+    return result
+
+
+def load_store(x='AOD', y='PV', data=None, path=FILE_PATH, cache_dir=None):
+    """读取变量对的充分统计量；缓存缺失或源数据已更新时重建"""
+    store_path = _store_path(_store_dir(path, cache_dir), (x, y))
+    if os.path.exists(os.path.join(store_path, 'meta.json')):
+        ds = read_store(store_path)
+        if ds.attrs.get('stamp', '') == _current_stamp(path):
+            return ds
+    return build_store([(x, y)], data, path, cache_dir)[(x, y)]
+
+
+def reduce_store(store, years=None, months=None, region=None, pooled=False):
+    """对选定的年份、月份（和区域）求和
+
+    years 可为 slice 或列表，months 为月份列表，region 为
+    (lat_min, lat_max, lon_min, lon_max)。pooled=True 时把区域内所有格点合并为一个样本。
+    """
+    sel = {}
+    if years is not None:
+        sel['year'] = years
+    if months is not None:
+        sel['month'] = months
+    store = select_region(store.sel(sel), region)
+    dims = ['year', 'month'] + (['lat', 'lon'] if pooled else [])
+    # 逐项为 float32，求和在 float64 中进行
+    sums = xr.Dataset({s: store[s].astype(np.float64).sum(dim=dims) for s in STATS})
+    sums['n'] = sums['n'].astype(np.int64)
+    return sums
+
+
+def regression(sums):
+    """由求和后的充分统计量得到相关系数、p 值和 y = slope*x + intercept"""
+    n = sums['n'].astype(np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cxx = n * sums['sxx'] - sums['sx'] ** 2
+        cyy = n * sums['syy'] - sums['sy'] ** 2
+        cxy = n * sums['sxy'] - sums['sx'] * sums['sy']
+        r = (cxy / np.sqrt(cxx * cyy)).clip(-1, 1)
+        slope = cxy / cxx
+        intercept = (sums['sy'] - slope * sums['sx']) / n
+        df = n - 2
+        t = r * np.sqrt(df / (1 - r * r))
+    p = xr.apply_ufunc(lambda t, df: 2 * stats.t.sf(np.abs(t), df), t, df)
+    ok = (n > 2) & (cxx > 0) & (cyy > 0)
+    return xr.Dataset({'r': r.where(ok), 'p': p.where(ok), 'slope': slope.where(ok),
+                       'intercept': intercept.where(ok), 'n': sums['n']})
+
+
+def subset_regression(x='AOD', y='PV', years=None, months=None, region=None, pooled=False, **kwargs):
+    """任意季节 / 年份段 / 区域的相关与回归，只读取缓存的充分统计量"""
+    store = load_store(x, y, **kwargs)
+    return regression(reduce_store(store, years, months, region, pooled))
+
+
+def append_store(new_data, path=FILE_PATH, cache_dir=None):
+    """追加新年份后更新所有变量对的充分统计量，只计算新年份并追加到 .npy 文件末尾，返回更新的目录列表"""
+    cache_dir = _store_dir(path, cache_dir)
+    if not os.path.isdir(cache_dir):
+        return []
+    stamp = _current_stamp(path)
+
+    written = []
+    for name in sorted(os.listdir(cache_dir)):
+        store_path = os.path.join(cache_dir, name)
+        if not os.path.exists(os.path.join(store_path, 'meta.json')):
+            continue
+        store = read_store(store_path)
+        x = new_data[store.attrs['x']].transpose(*DIMS)
+        y = new_data[store.attrs['y']].transpose(*DIMS)
+        new_years = x['year'].values
+        if np.any(np.isin(new_years, store['year'].values)):
+            continue
+        coords = {d: store[d].values for d in DIMS}
+        attrs = dict(store.attrs, stamp=stamp)
+        del store
+        for s, value in pair_stats(x.values, y.values).items():
+            _append_npy(os.path.join(store_path, s + '.npy'), value)
+        coords['year'] = np.concatenate([coords['year'], new_years])
+        np.savez(os.path.join(store_path, 'coords.npz'), **coords)
+        _write_meta(store_path, attrs)
+        written.append(store_path)
+    return written
@@ -5,35 +5,30 @@ Created on Tue Oct  8 21:14:16 2024
 @author: Chen Yong
 """
 
-import xarray as xr 
-import numpy as np
 import matplotlib.pyplot as plt
 from scipy.stats import pearsonr
+from pvpot import compute_pvpot
+from pv_loader import open_cube
+from bbox import select_bbox
 
 # 读取 NetCDF 数据文件
 file_path = r'C:\Users\Chen Yong\Desktop\InnovationProgram\PV_2007_2016.nc'
-data = xr.open_dataset(file_path)
+data = open_cube(file_path)
 
-# 提取所需数据并设置填充值为 NaN
+# 提取所需数据（读取时已将填充值设置为 NaN）
 years = data['year'].values
-aod_data = data['AOD'].fillna(np.nan)  # 气溶胶光学厚度 (AOD) 填充值为 NaN
-I = data['DSW'].fillna(np.nan)  # 短波辐射 (DSW) 填充值为 NaN
-T = data['Tas'].fillna(np.nan)  # 气温 (Tas) 填充值为 NaN
-WS = data['Wind'].fillna(np.nan)  # 风速 (Wind) 填充值为 NaN
 
 # 设置华北地区的经纬度范围
 lon_min, lon_max = 110.0, 120.0  # 华北地区的经度范围
 lat_min, lat_max = 32.0, 42.0    # 华北地区的纬度范围
 
-# 使用条件选择华北地区的数据
-aod_data_north_china = aod_data.where((data['lon'] >= lon_min) & (data['lon'] <= lon_max) & 
-                                      (data['lat'] >= lat_min) & (data['lat'] <= lat_max), drop=True)
-I_north_china = I.where((data['lon'] >= lon_min) & (data['lon'] <= lon_max) & 
-                        (data['lat'] >= lat_min) & (data['lat'] <= lat_max), drop=True)
-T_north_china = T.where((data['lon'] >= lon_min) & (data['lon'] <= lon_max) & 
-                        (data['lat'] >= lat_min) & (data['lat'] <= lat_max), drop=True)
-WS_north_china = WS.where((data['lon'] >= lon_min) & (data['lon'] <= lon_max) & 
-                          (data['lat'] >= lat_min) & (data['lat'] <= lon_max), drop=True)
+# 按经纬度下标区间同时选取各变量（零拷贝视图）
+data_north_china = select_bbox(data, lat_min, lat_max, lon_min, lon_max,
+                               variables=['AOD', 'DSW', 'Tas', 'Wind'])
+aod_data_north_china = data_north_china['AOD']  # 气溶胶光学厚度 (AOD)
+I_north_china = data_north_china['DSW']  # 短波辐射 (DSW)
+T_north_china = data_north_china['Tas']  # 气温 (Tas)
+WS_north_china = data_north_china['Wind']  # 风速 (Wind)
 
 # 过滤时间范围为 2007 到 2022 年
 aod_data_north_china = aod_data_north_china.sel(year=slice(2007, 2022))
@@ -41,20 +36,9 @@ I_north_china = I_north_china.sel(year=slice(2007, 2022))
 T_north_china = T_north_china.sel(year=slice(2007, 2022))
 WS_north_china = WS_north_china.sel(year=slice(2007, 2022))
 
-# 计算 Tcell 和 PVpot 的步骤
+# 计算光伏潜力 PVpot（逐年分块融合计算，不生成 Tcell、PR 中间数据块）
 c1, c2, c3, c4 = 2.56, 0.47, 0.065, 1.02  # 假设的常数值
-Tstc = 25  # 标准测试条件下温度 (25°C)
-Y = 0.005  # 单晶硅太阳能电池的Y系数
-Istc = 1000  # 标准短波辐射 (1000 W/m²)
-
-# 计算 Tcell
-Tcell = c1 + c2 * T_north_china + c3 * I_north_china - c4 * WS_north_china
-
-# 计算性能比 PR
-PR = 1 - Y * (Tcell - Tstc)
-
-# 计算光伏潜力 PVpot
-PVpot = PR * I_north_china / Istc
+PVpot = compute_pvpot(I_north_china, T_north_china, WS_north_china, coeffs=(c1, c2, c3, c4))
 
 # 对纬度、经度和月份维度进行平均，获得每年的 AOD 和 PVpot 数据
 aod_annual = aod_data_north_china.mean(dim=['lat', 'lon', 'month'])
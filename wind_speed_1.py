@@ -5,11 +5,11 @@ Created on Tue Apr 23 11:45:56 2024
 @author: Chen Yong
 """
 
-import xarray as xr
 import matplotlib.pyplot as plt
+from pv_loader import open_cube
 
 # 加载ERA5数据
-data = xr.open_dataset(r'C:\Users\Chen Yong\Downloads\PV_2007_2016.nc')
+data = open_cube(r'C:\Users\Chen Yong\Downloads\PV_2007_2016.nc')
 
 # 提取风速数据
 wind_speed = data['Wind']
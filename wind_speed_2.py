@@ -5,12 +5,11 @@ Created on Tue Apr 23 14:32:33 2024
 @author: Chen Yong
 """
 
-import xarray as xr
-import numpy as np
 import matplotlib.pyplot as plt
+from pv_loader import open_cube
 
 # 加载ERA5数据
-data = xr.open_dataset(r'C:\Users\Chen Yong\Downloads\PV_2007_2016.nc')
+data = open_cube(r'C:\Users\Chen Yong\Downloads\PV_2007_2016.nc')
 
 # 提取风速数据
 wind_speed = data['Wind']
@@ -33,9 +32,6 @@ lon = average_wind_speed['lon'].values
 lat = average_wind_speed['lat'].values
 wind = average_wind_speed.values
 
-# 将风速数据中的填充值设置为NaN
-wind = np.where(wind == -9999.0, np.nan, wind)
-
 # 绘制空间分布图
 plt.figure(figsize=(10, 8))
 plt.pcolormesh(lon, lat, wind, cmap='jet', shading='auto')
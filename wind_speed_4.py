@@ -5,14 +5,13 @@ Created on Tue Apr 23 15:16:31 2024
 @author: Chen Yong
 """
 
-import xarray as xr
-import numpy as np
 import matplotlib.pyplot as plt
 import cartopy.crs as ccrs
 import cartopy.feature as cfeature
+from pv_loader import open_cube
 
 # 加载ERA5数据
-data = xr.open_dataset(r'C:\Users\Chen Yong\Downloads\PV_2007_2016.nc')
+data = open_cube(r'C:\Users\Chen Yong\Downloads\PV_2007_2016.nc')
 
 # 提取风速数据
 wind_speed = data['Wind']
@@ -35,9 +34,6 @@ lon = average_wind_speed['lon'].values
 lat = average_wind_speed['lat'].values
 wind = average_wind_speed.values
 
-# 将风速数据中的填充值设置为NaN
-wind = np.where(wind == -9999.0, np.nan, wind)
-
 # 创建地图
 fig = plt.figure(figsize=(10, 8))
 ax = fig.add_subplot(1, 1, 1, projection=ccrs.PlateCarree())
@@ -5,14 +5,13 @@ Created on Tue Apr 23 15:43:49 2024
 @author: Chen Yong
 """
 
-import xarray as xr
-import numpy as np
 import matplotlib.pyplot as plt
 import cartopy.crs as ccrs
 import cartopy.feature as cfeature
+from pv_loader import open_cube
 
 # 加载ERA5数据
-data = xr.open_dataset(r'C:\Users\Chen Yong\Downloads\PV_2007_2016.nc')
+data = open_cube(r'C:\Users\Chen Yong\Downloads\PV_2007_2016.nc')
 
 
 
@@ -38,9 +37,6 @@ lon = average_wind_speed['lon'].values
 lat = average_wind_speed['lat'].values
 wind = average_wind_speed.values
 
-# 将风速数据中的填充值设置为NaN
-wind = np.where(wind == -9999.0, np.nan, wind)
-
 # 创建地图
 fig = plt.figure(figsize=(10, 8), dpi=300)
 
@@ -85,7 +81,6 @@ ax_inset.set_extent(south_china_sea_extent)
 selected_data_land = wind_speed.sel(year=years[(years >= 2007) & (years <= 2022)], month=12, lon=lon_range, lat=lat_range)
 average_wind_speed_land = selected_data_land.mean(dim='year')
 wind_land = average_wind_speed_land.values
-wind_land = np.where(wind_land == -9999.0, np.nan, wind_land)
 
 # 绘制中国陆地的风速空间分布
 ax_inset.pcolormesh(lon, lat, wind_land, cmap='jet', transform=ccrs.PlateCarree(), antialiased=True)
@@ -5,14 +5,14 @@ Created on Tue Apr 23 21:59:43 2024
 @author: Lenovo
 """
 
-import xarray as xr
-import numpy as np
 import matplotlib.pyplot as plt
 import cartopy.crs as ccrs
 import cartopy.feature as cfeature
+from pv_loader import open_cube
+from change_map import change_maps
 
 # 加载ERA5数据
-data = xr.open_dataset(r'C:\Users\Chen Yong\Downloads\PV_2007_2016.nc')
+data = open_cube(r'C:\Users\Chen Yong\Downloads\PV_2007_2016.nc')
 
 
 
@@ -29,19 +29,16 @@ lat_range = slice(10, 60)
 # 提取指定年份和中国区域的风速数据
 selected_data = wind_speed.sel(year=years, month=months, lon=lon_range, lat=lat_range)
 
-# 提取2007年和2022年的风速数据
-selected_data_2007 = selected_data.sel(year=2007)
-selected_data_2022 = selected_data.sel(year=2022)
+# 一次计算2007年到2022年的变化图（首末年差值、回归变化、百分比变化），主图和南海小图共用
+changes = change_maps(selected_data, start=2007, end=2022, reduce='sum')
 
 # 计算风速变化率
-change_wind_speed = (selected_data_2022.sum(dim='month') - selected_data_2007.sum(dim='month')) / 1.6
+change_wind_speed = changes['endpoint'] / 1.6
 
 # 提取经度、纬度和变化率数据
 lon = data['lon'].values
 lat = data['lat'].values
 wind = change_wind_speed.values
-# 将风速数据中的填充值设置为NaN
-wind = np.where(wind == -9999.0, np.nan, wind)
 
 # 创建地图
 fig = plt.figure(figsize=(10, 8), dpi=300)
@@ -83,18 +80,8 @@ ax_inset.add_feature(china_boundaries, linestyle='-', edgecolor='black')
 
 ax_inset.set_extent(south_china_sea_extent)
 
-# 提取指定年份和中国区域的风速数据
-selected_data = wind_speed.sel(year=years, month=months, lon=lon_range, lat=lat_range)
-
-# 提取2007年和2022年的风速数据
-selected_data_2007 = selected_data.sel(year=2007)
-selected_data_2022 = selected_data.sel(year=2022)
-
-# 计算风速变化率
-change_wind_speed = (selected_data_2022.sum(dim='month') - selected_data_2007.sum(dim='month')) / 1.6
-
-wind_land = change_wind_speed.values
-wind_land = np.where(wind_land == -9999.0, np.nan, wind_land)
+# 南海小图直接使用主图的变化率数组
+wind_land = wind
 
 # 绘制中国陆地的风速空间分布
 ax_inset.pcolormesh(lon, lat, wind_land, cmap='jet', transform=ccrs.PlateCarree(), antialiased=True)